@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
-import json, time, zipfile, hashlib, struct, sqlite3, subprocess, ssl, urllib.request, re, os, sysconfig, site, csv, sys, shutil, shlex, fcntl, signal, tempfile
+import json, time, zipfile, hashlib, functools, bisect, multiprocessing, threading, struct, sqlite3, subprocess, ssl, urllib.request, re, os, sysconfig, site, csv, sys, shutil, shlex, fcntl, signal, tempfile
 from importlib.metadata import entry_points, version
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path; from typing import Optional
 from hashlib import pbkdf2_hmac
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
@@ -16,20 +16,22 @@ DATA_DIR, DB_PATH = PROJECT_ROOT / "data", PROJECT_ROOT / "data" / "convos.db"
 STATE_PATH = DATA_DIR / "sync_state.json"
 HOOK_DIR, HOOK_STATE, HOOK_EMBED_DIRTY, HOOK_FTS_DIRTY, _NOISE = DATA_DIR/"hook_inbox", DATA_DIR/"hook_state.json", DATA_DIR/"hook_embeddings_dirty", DATA_DIR/"hook_fts_dirty", " AND NOT regexp_matches(content,'^(Base directory for this skill:|# AGENTS\\.md instructions for|<(codex_internal_context|environment_context|local-command-caveat|recommended_plugins|skill)( |>))')"
 CHATGPT_BURST, CHATGPT_RATE = 20, 8/15  # conservative policy below the observed ~200-detail failure point
+CLAUDE_BURST, CLAUDE_RATE = 20, 2  # overlapped detail fetches start no faster than the sequential fetcher they replaced
 
 # ---- db helpers ----
 def get_db(read_only: bool = False):
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     if read_only and not DB_PATH.exists(): return None
-    for i in range(30):
+    t0, delay = time.monotonic(), 0.05
+    while True:  # hook drains hold the lock for milliseconds: poll fast first, back off to 1s, give up after 30s
         try: return duckdb.connect(str(DB_PATH), read_only=read_only)
         except Exception as e:
             if "Conflicting lock is held" not in str(e): raise
-            if i < 29: time.sleep(1); continue
+            if time.monotonic()-t0 < 30: time.sleep(delay); delay = min(1, delay*2); continue
             raise ValueError("Database stayed locked by another convos process for 30 seconds.") from e
 
 def load_state():
-    try: return json.loads(STATE_PATH.read_text()) if STATE_PATH.exists() else {}
+    try: return json.loads(STATE_PATH.read_bytes()) if STATE_PATH.exists() else {}
     except Exception: return {}
 
 def atomic_write(path: Path, text):
@@ -40,11 +42,17 @@ def atomic_json(path: Path, data): atomic_write(path, json.dumps(data))
 def detect_source(path: Path):
     if path.is_dir(): return "codex" if (path / "sessions").exists() else "claude-code"
     if path.suffix == ".zip" or "chatgpt" in path.name.lower(): return "chatgpt"
-    data = json.loads(path.read_text())
+    with path.open("rb") as f: head = f.read(1 << 16)  # both exports name the distinguishing key near the top of the first conversation
+    if k := re.search(rb'"(mapping|chat_messages)"\s*:', head): return "chatgpt" if k[1] == b"mapping" else "claude"  # as a key: a title may equal the name
+    data = json.loads(path.read_bytes())
     if not data: raise ValueError(f"Empty export: {path}")
     return "chatgpt" if "mapping" in data[0] else "claude" if "chat_messages" in data[0] else "chatgpt"
 
-def latest_mtime(path: Path, globs: tuple[str, ...] = ("*.jsonl", "*.json", "*.zip")): return max((p.stat().st_mtime for g in globs for p in path.rglob(g)), default=0)
+def file_mtimes(root, exts: tuple[str, ...] = (".jsonl",)) -> dict[str, float]:  # one scandir walk, no Path object per file
+    try: entries = list(os.scandir(root))
+    except OSError: return {}  # skip unreadable directories like Path.rglob did: one locked folder must not abort the sync
+    return {k: v for e in entries for k, v in (file_mtimes(e.path, exts).items() if e.is_dir(follow_symlinks=False) else [(e.path, e.stat().st_mtime)] if e.name.endswith(exts) else ())}
+def latest_mtime(path: Path, exts: tuple[str, ...] = (".jsonl", ".json", ".zip")): return max(file_mtimes(path, exts).values(), default=0)
 
 def init_schema(conn):
     conn.execute("""CREATE TABLE IF NOT EXISTS conversations (
@@ -96,53 +104,48 @@ def ts_from_epoch(t):
     if t is None or t == "": return None
     try: return datetime.fromtimestamp(float(t))
     except Exception: return None
-def ts_from_iso(t): return datetime.fromisoformat(t.replace("Z", "+00:00")) if t else None
+def ts_from_iso(t): return datetime.fromisoformat(t) if t else None  # 3.12+ parses a trailing Z itself
 def ts_any(t): return ts_from_epoch(t) or (ts_from_iso(t) if isinstance(t, str) else None)  # chatgpt list api sends iso, exports send epoch
 
 def extract_content(content) -> dict:
     if isinstance(content, str): return {"text": content, "thinking": None, "tools": [], "attachments": []}
     if not isinstance(content, list): return {"text": "", "thinking": None, "tools": [], "attachments": []}
-    blocks = [b for b in content if isinstance(b, dict)]
-    return {
-        "text": "\n".join(b.get("text", "") or b.get("thinking", "") if b.get("type") in ("text", None) else "" for b in blocks).strip() or
-                "\n".join(str(b) for b in content if isinstance(b, str)).strip(),
-        "thinking": "\n".join(b["thinking"] for b in blocks if b.get("type") == "thinking" and b.get("thinking")).strip() or None,
-        "tools": [{"name": b["name"], "input": b.get("input", {}), "id": b.get("id")} for b in blocks if b.get("type") == "tool_use"] +
-                 [{"id": b.get("tool_use_id"), "output": b.get("content", "")} for b in blocks if b.get("type") == "tool_result"],
-        "attachments": [{"filename": b.get("name", b.get("file_name")), "mime_type": b.get("content_type", b.get("file_type")),
-                        "size": b.get("size", b.get("file_size")), "url": b.get("asset_pointer", b.get("url"))}
-                       for b in blocks if b.get("type") in ("image_asset_pointer", "file") or b.get("content_type") in ("image_asset_pointer", "file")]
-    }
+    text, thinking, uses, results, attachs = [], [], [], [], []
+    for b in content:
+        if not isinstance(b, dict): continue
+        if (t := b.get("type")) in ("text", None): text.append(b.get("text", "") or b.get("thinking", ""))
+        else:
+            text.append("")
+            if t == "tool_use": uses.append({"name": b["name"], "input": b.get("input", {}), "id": b.get("id")})
+            elif t == "tool_result": results.append({"id": b.get("tool_use_id"), "output": b.get("content", "")})
+            elif t == "thinking" and b.get("thinking"): thinking.append(b["thinking"])
+        if t in ("image_asset_pointer", "file") or b.get("content_type") in ("image_asset_pointer", "file"):
+            attachs.append({"filename": b.get("name", b.get("file_name")), "mime_type": b.get("content_type", b.get("file_type")),
+                            "size": b.get("size", b.get("file_size")), "url": b.get("asset_pointer", b.get("url"))})
+    return {"text": "\n".join(text).strip() or "\n".join(str(b) for b in content if isinstance(b, str)).strip(),
+            "thinking": "\n".join(thinking).strip() or None, "tools": uses + results, "attachments": attachs}
 
 # ---- cookie extraction ----
-def read_safari_cookies(domain: str) -> dict[str, str]:
+def safari_cookies():
+    """Yield (domain, name, value) from Safari's Cookies.binarycookies (big-endian page table, little-endian pages)."""
     path = Path.home() / "Library/Containers/com.apple.Safari/Data/Library/Cookies/Cookies.binarycookies"
     if not path.exists(): path = Path.home() / "Library/Cookies/Cookies.binarycookies"
-    if not path.exists(): return {}
-    cookies = {}
+    if not path.exists() or (data := path.read_bytes())[:4] != b'cook': return
+    pos = 8 + 4 * (num_pages := struct.unpack_from('>I', data, 4)[0])
+    for size in struct.unpack_from(f'>{num_pages}I', data, 8):
+        page, pos = data[pos:pos+size], pos + size
+        if page[:4] != b'\x00\x00\x01\x00': continue
+        for off in struct.unpack_from(f'<{struct.unpack_from("<I", page, 4)[0]}I', page, 8):
+            url_off, name_off, _, val_off = struct.unpack_from('<4I', page, off+16)
+            yield tuple(page[off+o:page.find(b'\x00', off+o)].decode('utf-8', errors='ignore') for o in (url_off, name_off, val_off))
+
+def read_safari_cookies(domain: str) -> dict[str, str]:
     target = domain.lstrip(".").lower()
-    try:
-        with open(path, 'rb') as f:
-            if f.read(4) != b'cook': return {}
-            num_pages = struct.unpack('>I', f.read(4))[0]
-            page_sizes = [struct.unpack('>I', f.read(4))[0] for _ in range(num_pages)]
-            for size in page_sizes:
-                page = f.read(size)
-                if page[:4] != b'\x00\x00\x01\x00': continue
-                num_cookies = struct.unpack('<I', page[4:8])[0]
-                offsets = [struct.unpack('<I', page[8+i*4:12+i*4])[0] for i in range(num_cookies)]
-                for off in offsets:
-                    url_off, name_off, val_off = struct.unpack('<I', page[off+16:off+20])[0], struct.unpack('<I', page[off+20:off+24])[0], struct.unpack('<I', page[off+28:off+32])[0]
-                    def read_str(o): return page[off+o:page.find(b'\x00', off+o)].decode('utf-8', errors='ignore')
-                    c_domain, c_name, c_val = read_str(url_off), read_str(name_off), read_str(val_off)
-                    cd = c_domain.lstrip(".").lower()
-                    if target in cd or cd in target or cd.endswith(target) or target.endswith(cd):
-                        cookies[c_name] = c_val
+    try: return {name: val for d, name, val in safari_cookies() if target in (cd := d.lstrip(".").lower()) or cd in target}
     except PermissionError as e:
         raise ValueError(
             "Safari cookies are not readable. Grant Full Disk Access to your terminal or use -b chrome."
         ) from e
-    return cookies
 
 def read_chrome_cookies(domain: str, profile: str | None = None) -> dict[str, str]:
     profile = profile or os.environ.get("CONVOS_CHROME_PROFILE", "Default")
@@ -152,43 +155,26 @@ def read_chrome_cookies(domain: str, profile: str | None = None) -> dict[str, st
     result = subprocess.run(["security", "find-generic-password", "-w", "-a", "Chrome", "-s", "Chrome Safe Storage"], capture_output=True, text=True, timeout=10)
     if result.returncode != 0: return {}
     key = pbkdf2_hmac('sha1', result.stdout.strip().encode(), b'saltysalt', 1003, 16)
-    cookies = {}
+    cookies, cipher = {}, Cipher(algorithms.AES(key), modes.CBC(b' ' * 16))
     conn = sqlite3.connect(f"file:{db_path}?mode=ro&nolock=1", uri=True)
     for name, encrypted, host in conn.execute("SELECT name, encrypted_value, host_key FROM cookies WHERE host_key LIKE ?", (f"%{domain}%",)):
         if encrypted[:3] == b'v10':
-            cipher = Cipher(algorithms.AES(key), modes.CBC(b' ' * 16))
             dec = cipher.decryptor(); decrypted = dec.update(encrypted[3:]) + dec.finalize()
             cookies[name] = (v[32:] if not (v := decrypted[:-decrypted[-1]])[:32].isascii() else v).decode('utf-8', errors='ignore')
     conn.close()
     return cookies
 
+_COOKIES = None  # (domain, browser, profile) -> cookies, only while a sync runs: its probes and fetchers share one keychain/cookie-store read
 def get_cookies(domain: str, browser: str = "safari", profile: str | None = None) -> dict[str, str]:
-    return read_safari_cookies(domain) if browser == "safari" else read_chrome_cookies(domain, profile=profile)
+    read = lambda: read_safari_cookies(domain) if browser == "safari" else read_chrome_cookies(domain, profile=profile)
+    return read() if _COOKIES is None else _COOKIES[key] if (key := (domain, browser, profile)) in _COOKIES else _COOKIES.setdefault(key, read())
 
 def get_cookies_any(domains: list[str], browser: str = "safari", profile: str | None = None) -> dict[str, str]:
     cookies = {}
     for d in domains: cookies.update(get_cookies(d, browser, profile=profile))
     return cookies
 
-def safari_cookie_domains():
-    path = Path.home() / "Library/Containers/com.apple.Safari/Data/Library/Cookies/Cookies.binarycookies"
-    if not path.exists(): path = Path.home() / "Library/Cookies/Cookies.binarycookies"
-    if not path.exists(): return set()
-    domains = set()
-    with open(path, 'rb') as f:
-        if f.read(4) != b'cook': return domains
-        num_pages = struct.unpack('>I', f.read(4))[0]
-        page_sizes = [struct.unpack('>I', f.read(4))[0] for _ in range(num_pages)]
-        for size in page_sizes:
-            page = f.read(size)
-            if page[:4] != b'\x00\x00\x01\x00': continue
-            num_cookies = struct.unpack('<I', page[4:8])[0]
-            offsets = [struct.unpack('<I', page[8+i*4:12+i*4])[0] for i in range(num_cookies)]
-            for off in offsets:
-                url_off = struct.unpack('<I', page[off+16:off+20])[0]
-                end = page.find(b'\x00', off+url_off)
-                if end != -1: domains.add(page[off+url_off:end].decode('utf-8', errors='ignore'))
-    return domains
+def safari_cookie_domains(): return {d for d, _, _ in safari_cookies()}
 
 def chrome_cookie_domains(profile: str | None = None):
     profile = profile or os.environ.get("CONVOS_CHROME_PROFILE", "Default")
@@ -230,27 +216,34 @@ def chatgpt_headers(cookies, base, ua, debug_profile: str | None = None):
 
 def merge_results(dst: "ParseResult", src: "ParseResult"): dst.convs += src.convs; dst.msgs += src.msgs; dst.tools += src.tools; dst.attachs += src.attachs
 
-def fetch_json(url: str, cookies: dict[str, str], headers: dict = None, timeout: int = 15, retries: int = 1, before_request=None, rate_limit_backoff=None) -> dict:
-    parts = []
-    for k, v in cookies.items():
-        s = f"{k}={v}"
-        try: s.encode("latin-1")
-        except UnicodeEncodeError: continue
-        parts.append(s)
-    cookie_str = "; ".join(parts)
+def rate_limiter(bucket, burst, rate):  # bucket = [tokens, last refill, blocked until], shared by every worker of one account
+    lock = threading.Lock()
+    def pace():
+        with lock:  # the rate caps request starts, not requests in flight
+            if (wait := bucket[2]-time.monotonic()) > 0: time.sleep(wait)  # a 429 blocks the whole account until its backoff ends
+            now = time.monotonic(); bucket[0] = min(burst, bucket[0]+(now-bucket[1])*rate); bucket[1] = now
+            if bucket[0] < 1: time.sleep((1-bucket[0])/rate); bucket[:2] = [0,time.monotonic()]
+            else: bucket[0] -= 1
+    def block(delay):
+        with lock: bucket[2] = max(bucket[2], time.monotonic()+delay)
+    return pace, block
+
+_ssl_context = functools.cache(ssl.create_default_context)  # CA bundle loads once per process, not once per request
+def fetch_json(url: str, cookies: dict[str, str], headers: dict = None, timeout: int = 15, retries: int = 1, before_request=None, rate_limit_backoff=None, on_rate_limit=None) -> dict:
+    cookie_str = "; ".join(s for k, v in cookies.items() if max(map(ord, s := f"{k}={v}")) < 256)  # headers are latin-1: skip cookies that cannot be sent
     hdrs = {"Cookie": cookie_str, "User-Agent": "Mozilla/5.0", "Accept": "application/json", **(headers or {})}
     req = urllib.request.Request(url, headers=hdrs)
     for i in range(retries+1):
         before_request and before_request()
         try:
-            with urllib.request.urlopen(req, context=ssl.create_default_context(), timeout=timeout) as resp:
+            with urllib.request.urlopen(req, context=_ssl_context(), timeout=timeout) as resp:
                 return json.loads(resp.read())
         except Exception as e:
-            if i == retries: raise
             code, retry = getattr(e, "code", None), (getattr(e, "headers", None) or {}).get("Retry-After", "")
+            if i == retries or isinstance(code, int) and 400 <= code < 500 and code not in (408, 429): raise  # bad auth/missing ids will not heal on retry
             delay = max(rate_limit_backoff or 30*(i+1), int(retry)) if code == 429 and str(retry).isdigit() else rate_limit_backoff or 30*(i+1) if code == 429 else 1+i
             if code == 429: typer.echo(f"  rate limited; retrying in {delay}s", err=True)
-            time.sleep(delay)
+            (on_rate_limit if code == 429 and on_rate_limit else time.sleep)(delay)  # a shared limiter pauses every worker, then before_request waits it out
 
 # ---- result type ----
 class ParseResult:
@@ -302,19 +295,15 @@ def fetch_chatgpt(browser: str = "safari", limit: int = 0, profiles: list[str |
     def fetch_with_profile(profile: str | None) -> ParseResult:
         cookies, base = chatgpt_cookie_base(browser, hosts, profile)
         headers = chatgpt_headers(cookies, base, ua, debug_profile=profile if debug else None)
-        key, account, r = profile or "default", headers.get("ChatGPT-Account-ID"), ParseResult(); saved = frontiers.get(key, {}); matched = account and isinstance(saved, dict) and saved.get("account") == account; frontier, boundary = (ts_any(saved.get("updated")), saved.get("id")) if matched else (None, None); bucket = limiters.setdefault(("account",account) if account else ("profile",browser,key), [CHATGPT_BURST,time.monotonic()])
-        def pace():
-            now = time.monotonic(); bucket[0] = min(CHATGPT_BURST, bucket[0]+(now-bucket[1])*CHATGPT_RATE); bucket[1] = now
-            if bucket[0] < 1: time.sleep((1-bucket[0])/CHATGPT_RATE); bucket[:] = [0,time.monotonic()]
-            else: bucket[0] -= 1
+        key, account, r = profile or "default", headers.get("ChatGPT-Account-ID"), ParseResult(); saved = frontiers.get(key, {}); matched = account and isinstance(saved, dict) and saved.get("account") == account; frontier, boundary = (ts_any(saved.get("updated")), saved.get("id")) if matched else (None, None); pace, block = rate_limiter(limiters.setdefault(("account",account) if account else ("profile",browser,key), [CHATGPT_BURST,time.monotonic(),0]), CHATGPT_BURST, CHATGPT_RATE)
         def parse_item_raw(item):
-            cid, gizmo = gen_id("chatgpt", item["id"]), item.get("gizmo_id"); conv = fetch_json(f"{base}/backend-api/conversation/{item['id']}", cookies, headers, timeout=20, retries=2, before_request=pace, rate_limit_backoff=300)
+            cid, gizmo = gen_id("chatgpt", item["id"]), item.get("gizmo_id"); conv = fetch_json(f"{base}/backend-api/conversation/{item['id']}", cookies, headers, timeout=20, retries=2, before_request=pace, rate_limit_backoff=300, on_rate_limit=block)
             msgs, tools, attachs = chatgpt_mapping(cid, conv.get("mapping", {})); times = [m["created_at"] for m in msgs if m["created_at"]]
             return dict(conv=dict(id=cid, source="chatgpt", title=item.get("title"), created_at=ts_any(conv.get("create_time") or item.get("create_time")) or min(times, key=datetime.timestamp, default=None), updated_at=ts_any(conv.get("update_time") or item.get("update_time")) or max(times, key=datetime.timestamp, default=None), model=item.get("model"), cwd=None, git_branch=None,
                                   project_id=gizmo, metadata=json.dumps({"remote_update_time":conv.get("update_time") or item.get("update_time"), **({"gizmo_id":gizmo} if gizmo else {})})), msgs=msgs, tools=tools, attachs=attachs)
         listed, seen, tail, offset, fetched, total = [], set(), set(), 0, 0, None
         while True:
-            data = fetch_json(f"{base}/backend-api/conversations?offset={offset}&limit=100&order=updated", cookies, headers, timeout=20, retries=1, before_request=pace, rate_limit_backoff=300)
+            data = fetch_json(f"{base}/backend-api/conversations?offset={offset}&limit=100&order=updated", cookies, headers, timeout=20, retries=1, before_request=pace, rate_limit_backoff=300, on_rate_limit=block)
             raw, reported, keys = data.get("items", []), data.get("total"), ",".join(data.keys())
             if debug: print(f"  chatgpt page offset={offset} items={len(raw)} total={reported} keys={keys}", flush=True)
             if total is not None and reported is not None and reported < total: raise RuntimeError(f"unstable list total {total}->{reported}")
@@ -331,13 +320,12 @@ def fetch_chatgpt(browser: str = "safari", limit: int = 0, profiles: list[str |
             offset += max(1, len(raw)-20)
         page = [it for it in listed if (cid := gen_id("chatgpt", it["id"])) not in known or known[cid] is None or (updated := ts_any(it.get("update_time"))) is None or updated.timestamp() > (frontier.timestamp() if frontier and cid in legacy else known[cid]+(5 if cid in legacy else 0))][:limit or len(listed)]
         if len(page) > CHATGPT_BURST: typer.echo(f"  chatgpt pacing bulk fetch ({CHATGPT_BURST} burst, then {int(CHATGPT_RATE*300)} requests/5m)")
-        for at in range(0, len(page), 20):
-            results = []
-            for item in page[at:at+20]:
-                try: results.append(parse_item_raw(item))
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            for at in range(0, len(page), 20):
+                try: results = list(ex.map(parse_item_raw, page[at:at+20]))
                 except Exception as e: raise RuntimeError(f"detail fetch failed: {e}") from e
-            chunk = ParseResult([x["conv"] for x in results], [m for x in results for m in x["msgs"]], [t for x in results for t in x["tools"]], [a for x in results for a in x["attachs"]]); sink(chunk) if sink else merge_results(r, chunk)
-            fetched += len(results); typer.echo(f"  chatgpt details {fetched}")
+                chunk = ParseResult([x["conv"] for x in results], [m for x in results for m in x["msgs"]], [t for x in results for t in x["tools"]], [a for x in results for a in x["attachs"]]); sink(chunk) if sink else merge_results(r, chunk)
+                fetched += len(results); typer.echo(f"  chatgpt details {fetched}")
         return r
     out, errs = ParseResult(), []
     for profile in profiles if profiles is not None else chatgpt_profiles(browser):
@@ -354,25 +342,19 @@ def fetch_claude(browser: str = "safari", limit: int = 0, since: datetime = None
                "Accept": "application/json", "Accept-Language": "en-US,en;q=0.9",
                "anthropic-client-sha": "unknown", "anthropic-client-version": "unknown"}
     print("  claude listing...", flush=True)
-    orgs = fetch_json("https://claude.ai/api/organizations", cookies, headers)
+    pace, block = rate_limiter([CLAUDE_BURST, time.monotonic(), 0], CLAUDE_BURST, CLAUDE_RATE); kw = dict(headers=headers, before_request=pace, on_rate_limit=block)
+    orgs = fetch_json("https://claude.ai/api/organizations", cookies, **kw)
     org_id = orgs[0]["uuid"] if orgs else None
     if not org_id: raise ValueError("Could not get Claude org ID")
-    r = ParseResult()
-    data = fetch_json(f"https://claude.ai/api/organizations/{org_id}/chat_conversations", cookies, headers)
+    data = fetch_json(f"https://claude.ai/api/organizations/{org_id}/chat_conversations", cookies, **kw)
     items = data if limit == 0 else data[:limit]
     if items: print(f"  claude total {len(items)}", flush=True)
-    fetched, step = 0, max(1, len(items)//10)
     def parse_item_raw(item):
-        nonlocal fetched
-        updated = ts_from_iso(item.get("updated_at") or item.get("created_at"))
-        if since and updated and updated <= since:
-            return False
-        cid = gen_id("claude", item["uuid"])
-        project = item.get("project_uuid")
+        cid, project, r = gen_id("claude", item["uuid"]), item.get("project_uuid"), ParseResult()
         r.convs.append(dict(id=cid, source="claude", title=item.get("name"), created_at=ts_from_iso(item.get("created_at")),
                            updated_at=ts_from_iso(item.get("updated_at")), model=item.get("model"), cwd=None, git_branch=None,
                            project_id=project, metadata=json.dumps({"project_uuid": project}) if project else "{}"))
-        conv = fetch_json(f"https://claude.ai/api/organizations/{org_id}/chat_conversations/{item['uuid']}", cookies, headers)
+        conv = fetch_json(f"https://claude.ai/api/organizations/{org_id}/chat_conversations/{item['uuid']}", cookies, **kw)
         for m in conv.get("chat_messages", []):
             mid = gen_id("claude", f"{cid}:{m.get('uuid', '')}")
             ts = ts_from_iso(m.get("created_at"))
@@ -393,20 +375,30 @@ def fetch_claude(browser: str = "safari", limit: int = 0, since: datetime = None
                 elif isinstance(block, str): text_parts.append(block)
             if text := "\n".join(text_parts).strip():
                 r.msgs.append(dict(id=mid, conversation_id=cid, role=m.get("sender", "unknown"), content=text, thinking=None, created_at=ts, model=None, metadata="{}", parent_id=None))
-        fetched += 1
-        return True
-    for idx, item in enumerate(items):
-        cid = item.get("uuid") if isinstance(item, dict) else "unknown"
-        did_fetch = parse_item_raw(item)
-        if did_fetch is False:
-            if idx == len(items)-1 or (idx+1) % step == 0: print(f"  claude fetched {fetched}/{len(items)}", flush=True)
-            continue
-        if idx == len(items)-1 or (idx+1) % step == 0: print(f"  claude fetched {fetched}/{len(items)}", flush=True)
+        return r
+    # a uuid listed twice keeps its last listing entry, at the position where it was first listed
+    todo = [it for it in {it["uuid"]: it for it in items}.values() if not (since and (updated := ts_from_iso(it.get("updated_at") or it.get("created_at"))) and updated <= since)]
+    r, step = ParseResult(), max(1, len(todo)//10)
+    with ThreadPoolExecutor(max_workers=4) as ex:  # detail fetches are independent round-trips: overlap a few, paced like the sequential fetcher
+        for n, part in enumerate(ex.map(parse_item_raw, todo), 1):
+            merge_results(r, part)
+            if n == len(todo) or n % step == 0: print(f"  claude fetched {n}/{len(todo)}", flush=True)
     return r
 
 # ---- file parsers ----
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+def iter_json_array(s: str):  # decode a top-level JSON array one element at a time: exports never hold every parsed conversation at once
+    if not s.lstrip(" \t\n\r").startswith("["): yield from json.loads(s); return
+    dec, ws, i = json.JSONDecoder(), lambda i: _JSON_WS.match(s, i).end(), s.index("[") + 1
+    if s[(i := ws(i)):i+1] != "]":
+        while True:
+            v, i = dec.raw_decode(s, ws(i)); yield v
+            if s[(i := ws(i)):i+1] != ",": break
+            i += 1
+    if s[i:i+1] != "]" or ws(i+1) != len(s): raise json.JSONDecodeError("Expecting ',' delimiter or end of array", s, i)
+
 def parse_chatgpt(path: Path) -> ParseResult:
-    data = json.load(zipfile.ZipFile(path).open('conversations.json')) if path.suffix == ".zip" else json.loads(path.read_text())
+    data = iter_json_array((zipfile.ZipFile(path).read('conversations.json') if path.suffix == ".zip" else path.read_bytes()).decode("utf-8-sig"))
     r = ParseResult()
     def parse_conv(c):
         cid, gizmo = gen_id("chatgpt", c.get("id", "")), c.get("gizmo_id")
@@ -422,22 +414,20 @@ def parse_chatgpt(path: Path) -> ParseResult:
     return r
 
 def parse_claude(path: Path) -> ParseResult:
-    data = json.loads(path.read_text())
+    data = iter_json_array(path.read_bytes().decode("utf-8-sig"))
     def parse_conv(c):
         cid = gen_id("claude", c["uuid"] if "uuid" in c else c["id"])
-        msgs_data = c.get("chat_messages", [])
+        mids = [(m, gen_id("claude", f"{cid}:{m['uuid'] if 'uuid' in m else m['id']}")) for m in c.get("chat_messages", [])]
         return {
             "conv": dict(id=cid, source="claude", title=c.get("name") or c.get("title"), created_at=ts_from_iso(c.get("created_at")),
                         updated_at=ts_from_iso(c.get("updated_at")), model=c.get("model"), cwd=None, git_branch=None, project_id=None, metadata="{}"),
-            "msgs": [dict(id=(mid := gen_id("claude", f"{cid}:{m['uuid'] if 'uuid' in m else m['id']}")), conversation_id=cid,
-                        role=m.get("sender", "unknown"), content=ec["text"], thinking=ec["thinking"],
+            "msgs": [dict(id=mid, conversation_id=cid, role=m.get("sender", "unknown"), content=ec["text"], thinking=ec["thinking"],
                         created_at=ts_from_iso(m.get("created_at")), model=None, metadata="{}", parent_id=None)
-                    for m in msgs_data if (ec := extract_content(m.get("text") or m.get("content", "")))["text"]],
-            "attachs": [dict(id=gen_id("claude", f"attach:{gen_id('claude', f'{cid}:{m['uuid'] if 'uuid' in m else m['id']}')}:{i}"),
-                            message_id=gen_id("claude", f"{cid}:{m['uuid'] if 'uuid' in m else m['id']}"),
+                    for m, mid in mids if (ec := extract_content(m.get("text") or m.get("content", "")))["text"]],
+            "attachs": [dict(id=gen_id("claude", f"attach:{mid}:{i}"), message_id=mid,
                             filename=a.get("file_name"), mime_type=a.get("file_type"), size=a.get("file_size"),
                             path=None, url=a.get("url"), created_at=ts_from_iso(m.get("created_at")))
-                       for m in msgs_data for i, a in enumerate(m.get("attachments", []))]}
+                       for m, mid in mids for i, a in enumerate(m.get("attachments", []))]}
     parsed = [p for idx, c in enumerate(data)
               if (p := safe_parse(f"claude export conv {c.get('uuid') if isinstance(c, dict) else idx}", parse_conv, c))]
     return ParseResult(convs=[p["conv"] for p in parsed], msgs=[m for p in parsed for m in p["msgs"]],
@@ -445,12 +435,11 @@ def parse_claude(path: Path) -> ParseResult:
 
 def load_jsonl(path: Path) -> list[dict]:
     out = []
-    for i, line in enumerate(path.read_text().splitlines(), start=1):
-        if not line.strip(): continue
-        try:
-            out.append(json.loads(line))
-        except Exception as e:
-            log_parse_error(f"jsonl {path} line {i}", e)
+    with path.open("rb") as f:
+        for i, line in enumerate(f, start=1):
+            if not line.strip(): continue
+            try: out.append(json.loads(line.decode()))  # str skips json's per-line encoding sniff
+            except Exception as e: log_parse_error(f"jsonl {path} line {i}", e)
     return out
 
 def parse_claude_code_session(jsonl: Path) -> dict:
@@ -459,55 +448,57 @@ def parse_claude_code_session(jsonl: Path) -> dict:
     cid, src = gen_id("claude-code", str(jsonl)), "claude-code"
     timestamps = [ts_from_iso(e["timestamp"]) for e in events if "timestamp" in e]
     system = next((e for e in events if e.get("type") == "system"), {})
-    msg_events = [(i, e) for i, e in enumerate(events) if "message" in e]
-    uuid2id = {e["uuid"]: gen_id(src, f"{cid}:{idx}") for idx, (i, e) in enumerate(msg_events) if "uuid" in e}
-
-    def make_msg(idx, i, e):
-        c = extract_content(e["message"].get("content", e["message"].get("text", "")))
-        return dict(id=gen_id(src, f"{cid}:{idx}"), conversation_id=cid, role=e["type"],
-                   content=c["text"], thinking=c["thinking"], created_at=ts_from_iso(e.get("timestamp")),
-                   model="claude" if e["type"] == "assistant" else None, metadata="{}", parent_id=uuid2id.get(e.get("parentUuid")))
-
-    def make_tools(idx, i, e):
-        c, ts = extract_content(e["message"].get("content", [])), ts_from_iso(e.get("timestamp"))
-        mid = gen_id(src, f"{cid}:{idx}")
-        return [dict(id=gen_id(src, f"tool:{cid}:{idx}:{j}"), message_id=mid, tool_name=t.get("name", t.get("id")),
-                    input=json.dumps(t.get("input", {})), output=json.dumps(t.get("output", "")) if "output" in t else "{}",
-                    status="complete" if "output" in t else "pending", duration_ms=None, created_at=ts) for j, t in enumerate(c["tools"])]
-
-    def make_edits(idx, i, e):
-        c, ts = extract_content(e["message"].get("content", [])), ts_from_iso(e.get("timestamp"))
-        mid = gen_id(src, f"{cid}:{idx}")
-        return [dict(id=gen_id(src, f"edit:{cid}:{idx}:{j}"), message_id=mid, file_path=t["input"]["file_path"],
-                    edit_type=t["name"].lower(), content=t["input"].get("content") or t["input"].get("new_string", ""), created_at=ts,
-                    old_content=t["input"].get("old_string"))
-               for j, t in enumerate(c["tools"]) if t.get("name") in ("Write", "Edit", "MultiEdit") and t.get("input", {}).get("file_path")]
-
-    msgs = [make_msg(idx, i, e) for idx, (i, e) in enumerate(msg_events) if (c := extract_content(e["message"].get("content", "")))["text"] or c["tools"]]  # keep tool-only turns: tools/edits reference them
+    msg_events = [e for e in events if "message" in e]
+    ids = [gen_id(src, f"{cid}:{idx}") for idx in range(len(msg_events))]  # hash each message id once: parent links reuse it
+    uuid2id = {e["uuid"]: ids[idx] for idx, e in enumerate(msg_events) if "uuid" in e}
+    msgs, tools, edits = [], [], []
+    for idx, e in enumerate(msg_events):
+        c = extract_content(e["message"].get("content", ""))
+        if not (c["text"] or c["tools"]): continue  # keep tool-only turns: tools/edits reference them
+        mid, ts = ids[idx], ts_from_iso(e.get("timestamp"))
+        msgs.append(dict(id=mid, conversation_id=cid, role=e["type"], content=c["text"], thinking=c["thinking"], created_at=ts,
+                         model="claude" if e["type"] == "assistant" else None, metadata="{}", parent_id=uuid2id.get(e.get("parentUuid"))))
+        tools += [dict(id=gen_id(src, f"tool:{cid}:{idx}:{j}"), message_id=mid, tool_name=t.get("name", t.get("id")),
+                       input=json.dumps(t.get("input", {})), output=json.dumps(t.get("output", "")) if "output" in t else "{}",
+                       status="complete" if "output" in t else "pending", duration_ms=None, created_at=ts) for j, t in enumerate(c["tools"])]
+        edits += [dict(id=gen_id(src, f"edit:{cid}:{idx}:{j}"), message_id=mid, file_path=t["input"]["file_path"],
+                       edit_type=t["name"].lower(), content=t["input"].get("content") or t["input"].get("new_string", ""), created_at=ts,
+                       old_content=t["input"].get("old_string"))
+                  for j, t in enumerate(c["tools"]) if t.get("name") in ("Write", "Edit", "MultiEdit") and t.get("input", {}).get("file_path")]
     if not msgs: return None
     return {
         "conv": dict(id=cid, source=src, title=f"{jsonl.parent.name.replace('-Users-', '~/').replace('-', '/')} ({jsonl.stem[:8]})",
                     created_at=timestamps[0] if timestamps else None, updated_at=timestamps[-1] if timestamps else None,
                     model="claude", cwd=system.get("cwd"), git_branch=system.get("gitBranch"), project_id=None,
                     metadata=json.dumps({"session_id": jsonl.stem})),
-        "msgs": msgs,
-        "tools": [t for idx, (i, e) in enumerate(msg_events) for t in make_tools(idx, i, e)],
-        "edits": [ed for idx, (i, e) in enumerate(msg_events) for ed in make_edits(idx, i, e)]}
+        "msgs": msgs, "tools": tools, "edits": edits}
+
+def parse_session_file(kind, parser, jsonl): return safe_parse(f"{kind} session {jsonl}", parser, jsonl)
+def parse_sessions(kind, parser, files) -> list[dict]:  # sessions are independent and CPU-bound: big batches fan out over processes
+    if len(files := list(files)) < 64 or (os.cpu_count() or 1) < 2: return [s for f in files if (s := parse_session_file(kind, parser, f))]
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as ex:
+        os.environ["CONVOS_PARSE_WORKER"] = "1"  # workers spawn during map's eager submits and inherit it: they import cli for the parsers, not the plugins
+        try: parts = ex.map(functools.partial(parse_session_file, kind, parser), files, chunksize=8)
+        finally: os.environ.pop("CONVOS_PARSE_WORKER", None)
+        return [s for s in parts if s]
 
 def parse_claude_code(projects_dir: Path, files: list[Path] | None = None) -> ParseResult:
-    sessions = [s for jsonl in (files or projects_dir.rglob("*.jsonl"))
-                if (s := safe_parse(f"claude-code session {jsonl}", parse_claude_code_session, jsonl))]
+    sessions = parse_sessions("claude-code", parse_claude_code_session, files or projects_dir.rglob("*.jsonl"))
     return ParseResult(
         convs=[s["conv"] for s in sessions], msgs=[m for s in sessions for m in s["msgs"]],
         tools=[t for s in sessions for t in s["tools"]], edits=[e for s in sessions for e in s["edits"]])
 
+_HEREDOC, _HEREDOC_TARGET, _REDIRECT, _PATCH_FILE, _EXIT_FAIL = map(re.compile, (r"<<-?\s*'?(\w+)'?", r"(?:(?<![0-9&])>{1,2}\s*|\btee\s+(?:-a\s+)?)([^\s;|&<>'\"]+)", r"(?<![0-9&])>{1,2}\s*([^\s;|&<>'\"]+\.[A-Za-z]{1,5})\b", r"\*\*\* (Update|Add|Delete) File: (.+)", r"exit code: [1-9]\d*"))  # hot in codex edit extraction
 def parse_codex_session(jsonl: Path) -> dict | None:
     events = load_jsonl(jsonl)
     if not events: return None
     cid, src = gen_id("codex", str(jsonl)), "codex"
-    timestamps = [ts_from_iso(e["timestamp"]) for e in events if "timestamp" in e]
-    meta = next((e["payload"] for e in events if e.get("type") == "session_meta"), {})
-    items = [(i, e["payload"]) for i, e in enumerate(events) if e.get("type") == "response_item" and "payload" in e]
+    timestamps, meta, items = [], None, []
+    for i, e in enumerate(events):  # one sweep over the session instead of three
+        if "timestamp" in e: timestamps.append(ts_from_iso(e["timestamp"]))
+        if (t := e.get("type")) == "response_item" and "payload" in e: items.append((i, e["payload"]))
+        elif t == "session_meta" and meta is None: meta = e["payload"]
+    meta, ts_at = meta if meta is not None else {}, lambda i: timestamps[i] if i < len(timestamps) else None
 
     def extract_msg_text(p):
         return "\n".join(b["text"] for b in p.get("content", []) if isinstance(b, dict) and b.get("type") in ("input_text", "output_text", "text") and b.get("text"))
@@ -516,20 +507,21 @@ def parse_codex_session(jsonl: Path) -> dict | None:
 
     mitems = [(i, p, t) for i, p in items if p.get("type") == "message" and p.get("role") not in ("developer", "system") and (t := extract_msg_text(p))]
     if not (msgs := [dict(id=gen_id(src, f"{cid}:{i}"), conversation_id=cid, role=p["role"], content=t.strip(),
-                          thinking=None, created_at=timestamps[i] if i < len(timestamps) else None, model=None, metadata="{}", parent_id=None)
+                          thinking=None, created_at=ts_at(i), model=None, metadata="{}", parent_id=None)
                      for i, p, t in mitems]): return None
-    anchor = lambda k: gen_id(src, f"{cid}:{next((i for i, _, _ in reversed(mitems) if i <= k), mitems[0][0])}")  # function_call items are not messages; attach to nearest preceding one
+    mids, ids = [i for i, _, _ in mitems], [m["id"] for m in msgs]
+    anchor = lambda k: ids[max(bisect.bisect_right(mids, k) - 1, 0)]  # function_call items are not messages; attach to nearest preceding one
 
     tools = [dict(id=gen_id(src, f"tool:{cid}:{i}"), message_id=anchor(i), tool_name=p["name"],
                  input=json.dumps(args), output="{}", status="pending", duration_ms=None,
-                 created_at=timestamps[i] if i < len(timestamps) else None)
+                 created_at=ts_at(i))
             for i, p in items if p.get("type") == "function_call" and (args := norm_args(p)) is not None] + \
            [dict(id=gen_id(src, f"toolout:{cid}:{i}"), message_id=anchor(i), tool_name=p.get("call_id"),
                  input="{}", output=json.dumps(p.get("output", "")), status="complete", duration_ms=None,
-                 created_at=timestamps[i] if i < len(timestamps) else None)
+                 created_at=ts_at(i))
             for i, p in items if p.get("type") == "function_call_output"]
-    custom_out = {p.get("call_id"):p.get("output", "") for _, p in items if p.get("type") == "custom_tool_call_output"}
-    tools += [dict(id=gen_id(src, f"custom:{cid}:{i}"), message_id=anchor(i), tool_name=p["name"], input=json.dumps({"code":p.get("input", "")}), output=json.dumps(custom_out.get(p.get("call_id"), "")), status="failed" if any(x in json.dumps(custom_out.get(p.get("call_id"), "")).lower() for x in ("script failed","verification failed")) or re.search(r"exit code: [1-9]\d*",json.dumps(custom_out.get(p.get("call_id"), "")).lower()) else "complete" if p.get("call_id") in custom_out or p.get("status") == "completed" else p.get("status", "pending"), duration_ms=None, created_at=timestamps[i] if i < len(timestamps) else None) for i, p in items if p.get("type") == "custom_tool_call"]
+    custom_out = {p.get("call_id"):json.dumps(p.get("output", "")) for _, p in items if p.get("type") == "custom_tool_call_output"}  # encoded once, reused for output/status/edits
+    tools += [dict(id=gen_id(src, f"custom:{cid}:{i}"), message_id=anchor(i), tool_name=p["name"], input=json.dumps({"code":p.get("input", "")}), output=(o := custom_out.get(p.get("call_id"), '""')), status="failed" if (lo := o.lower()) and (any(x in lo for x in ("script failed","verification failed")) or _EXIT_FAIL.search(lo)) else "complete" if p.get("call_id") in custom_out or p.get("status") == "completed" else p.get("status", "pending"), duration_ms=None, created_at=ts_at(i)) for i, p in items if p.get("type") == "custom_tool_call"]
 
     def patch_edits(args):
         """File edits from shell commands, exact or skipped: apply_patch hunks (context+minus -> context+plus,
@@ -539,10 +531,10 @@ def parse_codex_session(jsonl: Path) -> dict | None:
         root = args.get("workdir") or meta.get("cwd") or ""
         if "*** Begin Patch" not in cmd:
             head = cmd.split("\n", 1)[0]
-            if (hm := re.search(r"<<-?\s*'?(\w+)'?", head)) and (tm := re.search(r"(?:(?<![0-9&])>{1,2}\s*|\btee\s+(?:-a\s+)?)([^\s;|&<>'\"]+)", head)) \
+            if (hm := _HEREDOC.search(head)) and (tm := _HEREDOC_TARGET.search(head)) \
                and (body := re.search(rf"\n(.*)\n{hm.group(1)}\s*$", cmd, re.S)) and tm.group(1) != "/dev/null":
                 return [(os.path.join(root, tm.group(1)), "write", body.group(1), None)]
-            if (tm := re.search(r"(?<![0-9&])>{1,2}\s*([^\s;|&<>'\"]+\.[A-Za-z]{1,5})\b", head)) and tm.group(1) != "/dev/null":
+            if (tm := _REDIRECT.search(head)) and tm.group(1) != "/dev/null":
                 return [(os.path.join(root, tm.group(1)), "shell", cmd, None)]
             return []
         out, path, op, old, new = [], None, None, [], []
@@ -550,7 +542,7 @@ def parse_codex_session(jsonl: Path) -> dict | None:
             if path and (old or new or op != "edit"): out.append((path, op, "\n".join(new), "\n".join(old) or None))
             old.clear(); new.clear()
         for ln in cmd.split("*** Begin Patch", 1)[1].split("*** End Patch", 1)[0].splitlines():
-            if m := re.match(r"\*\*\* (Update|Add|Delete) File: (.+)", ln):
+            if m := _PATCH_FILE.match(ln):
                 flush(); op, path = {"Update": "edit", "Add": "write", "Delete": "delete"}[m.group(1)], os.path.join(root, m.group(2).strip())
             elif ln.startswith("@@"): flush()
             elif ln.startswith("***"): pass  # e.g. *** End of File
@@ -560,17 +552,17 @@ def parse_codex_session(jsonl: Path) -> dict | None:
         flush(); return out
 
     def custom_edits(p):
-        code = p.get("input", ""); names = re.findall(r"await\s+tools\.apply_patch\(\s*(\w+)\s*\)", code); out=json.dumps(custom_out.get(p.get("call_id"), "")).lower(); ok=any(x in out for x in ("script completed","exit code: 0","success. updated")) and not any(x in out for x in ("script failed","verification failed")) and not re.search(r"exit code: [1-9]\d*",out)
+        code = p.get("input", ""); names = re.findall(r"await\s+tools\.apply_patch\(\s*(\w+)\s*\)", code); out=custom_out.get(p.get("call_id"), '""').lower(); ok=any(x in out for x in ("script completed","exit code: 0","success. updated")) and not any(x in out for x in ("script failed","verification failed")) and not _EXIT_FAIL.search(out)
         if not ok or p.get("name") == "apply_patch": return patch_edits({"cmd":code}) if ok else []
         vals = {n:v for n, s in re.findall(r"(?:const|let|var)\s+(\w+)\s*=\s*(\"(?:\\.|[^\"\\])*\")", code, re.S) if n in names and (v := safe_parse("codex custom edit", json.loads, s)) is not None}
         patches = [vals[n] for n in names if n in vals] + [p for s in re.findall(r"await\s+tools\.apply_patch\(\s*(\"(?:\\.|[^\"\\])*\")\s*\)", code, re.S) if (p := safe_parse("codex custom edit", json.loads, s)) is not None]
         return [e for patch in patches if "*** Begin Patch" in patch for e in patch_edits({"cmd":patch})]
 
     edits = [dict(id=gen_id(src, f"edit:{cid}:{i}:{j}"), message_id=anchor(i), file_path=fp, edit_type=op,
-                 content=c, created_at=timestamps[i] if i < len(timestamps) else None, old_content=o)
+                 content=c, created_at=ts_at(i), old_content=o)
             for i, p in items if p.get("type") == "function_call" and p.get("name") in ("exec_command", "shell_command", "shell")
             and (args := norm_args(p)) for j, (fp, op, c, o) in enumerate(patch_edits(args))]
-    edits += [dict(id=gen_id(src, f"edit:{cid}:{i}:{j}"), message_id=anchor(i), file_path=fp, edit_type=op, content=c, created_at=timestamps[i] if i < len(timestamps) else None, old_content=o) for i, p in items if p.get("type") == "custom_tool_call" for j, (fp, op, c, o) in enumerate(custom_edits(p))]
+    edits += [dict(id=gen_id(src, f"edit:{cid}:{i}:{j}"), message_id=anchor(i), file_path=fp, edit_type=op, content=c, created_at=ts_at(i), old_content=o) for i, p in items if p.get("type") == "custom_tool_call" for j, (fp, op, c, o) in enumerate(custom_edits(p))]
 
     return {
         "conv": dict(id=cid, source=src, title=meta.get("cwd") or jsonl.stem,
@@ -582,36 +574,43 @@ def parse_codex_session(jsonl: Path) -> dict | None:
 def parse_codex(codex_dir: Path, files: list[Path] | None = None) -> ParseResult:
     sessions_dir = codex_dir / "sessions"
     if not sessions_dir.exists(): return ParseResult()
-    sessions = [s for jsonl in (files or sessions_dir.rglob("*.jsonl"))
-                if (s := safe_parse(f"codex session {jsonl}", parse_codex_session, jsonl))]
+    sessions = parse_sessions("codex", parse_codex_session, files or sessions_dir.rglob("*.jsonl"))
     return ParseResult(
         convs=[s["conv"] for s in sessions], msgs=[m for s in sessions for m in s["msgs"]],
         tools=[t for s in sessions for t in s["tools"]], edits=[e for s in sessions for e in s["edits"]])
 
-_MSG_UPS = "INSERT INTO messages VALUES (?,?,?,?,?,?,?,?,NULL,?) ON CONFLICT(id) DO UPDATE SET conversation_id=excluded.conversation_id, role=excluded.role, content=excluded.content, thinking=excluded.thinking, created_at=excluded.created_at, model=excluded.model, metadata=excluded.metadata, parent_id=excluded.parent_id, embedding=CASE WHEN messages.content IS DISTINCT FROM excluded.content THEN NULL ELSE messages.embedding END"
-_CONV_UPS = "INSERT INTO conversations VALUES (?,?,?,?,?,?,?,?,?,?) ON CONFLICT(id) DO UPDATE SET source=excluded.source,title=excluded.title,created_at=CASE WHEN conversations.created_at IS NULL OR excluded.created_at < conversations.created_at THEN excluded.created_at ELSE conversations.created_at END,updated_at=CASE WHEN conversations.updated_at IS NULL OR excluded.updated_at > conversations.updated_at THEN excluded.updated_at ELSE conversations.updated_at END,model=COALESCE(excluded.model,conversations.model),cwd=COALESCE(excluded.cwd,conversations.cwd),git_branch=COALESCE(excluded.git_branch,conversations.git_branch),project_id=COALESCE(excluded.project_id,conversations.project_id),metadata=excluded.metadata"
+_ROWS, _IN_IDS = "BY NAME SELECT unnest(from_json_strict(?::JSON, ?), recursive := true)", "id IN (SELECT unnest(from_json_strict(?::JSON, '[\"VARCHAR\"]')))"  # batches cross as one JSON document: DuckDB binds Python parameters value by value
+_MSG_UPS = f"INSERT INTO messages {_ROWS} ON CONFLICT(id) DO UPDATE SET conversation_id=excluded.conversation_id, role=excluded.role, content=excluded.content, thinking=excluded.thinking, created_at=excluded.created_at, model=excluded.model, metadata=excluded.metadata, parent_id=excluded.parent_id, embedding=CASE WHEN messages.content IS DISTINCT FROM excluded.content THEN NULL ELSE messages.embedding END"
+_CONV_UPS = f"INSERT INTO conversations {_ROWS} ON CONFLICT(id) DO UPDATE SET source=excluded.source,title=excluded.title,created_at=CASE WHEN conversations.created_at IS NULL OR excluded.created_at < conversations.created_at THEN excluded.created_at ELSE conversations.created_at END,updated_at=CASE WHEN conversations.updated_at IS NULL OR excluded.updated_at > conversations.updated_at THEN excluded.updated_at ELSE conversations.updated_at END,model=COALESCE(excluded.model,conversations.model),cwd=COALESCE(excluded.cwd,conversations.cwd),git_branch=COALESCE(excluded.git_branch,conversations.git_branch),project_id=COALESCE(excluded.project_id,conversations.project_id),metadata=excluded.metadata"
+def _json_ts(v): return (v.astimezone().replace(tzinfo=None) if v.tzinfo else v).isoformat()  # same local wall time DuckDB stores for a bound aware datetime
 
 def upsert(conn, r: ParseResult):
-    cids, mids = [c["id"] for c in r.convs], [m["id"] for m in r.msgs]
-    cur = conn.execute
-    existing = set(cur(f"SELECT id FROM conversations WHERE id IN ({','.join(['?']*len(cids))})", cids).fetchall()) if cids else set()
-    old_msgs = {x[0]: x for x in cur(f"SELECT * FROM messages WHERE id IN ({','.join(['?']*len(mids))})", mids).fetchall()} if mids else {}
-    new_convs = set(cids) - {x[0] for x in existing}
-    changed_msgs = {m["id"] for m in r.msgs if m["id"] not in old_msgs or old_msgs[m["id"]][2:5] != tuple(m[k] for k in ("role", "content", "thinking"))}
+    cids, cur, ids = [c["id"] for c in r.convs], conn.execute, lambda rows: json.dumps([x["id"] for x in rows])
+    types = {(t, k): v for t, k, v in cur("SELECT table_name, column_name, data_type FROM information_schema.columns WHERE table_schema = 'main'").fetchall()}
+    existing = {x[0] for x in cur(f"SELECT id FROM conversations WHERE {_IN_IDS}", [ids(r.convs)]).fetchall()}
+    old_msgs = {x[0]: x[1:] for x in cur(f"SELECT id, role, content, thinking FROM messages WHERE {_IN_IDS}", [ids(r.msgs)]).fetchall()}
+    new_convs = set(cids) - existing
+    changed_msgs = {m["id"] for m in r.msgs if old_msgs.get(m["id"]) != (m["role"], m["content"], m["thinking"])}
     updated = {m["conversation_id"] for m in r.msgs if m["id"] in changed_msgs} - new_convs
-    for c in r.convs: conn.execute(_CONV_UPS, list(c.values()))
-    for m in r.msgs:
-        vals = list(m.values()); old = old_msgs.get(m["id"])
-        if old and old[2:5] != tuple(vals[2:5]): hist = list(old); hist[0] = gen_id("history", f"messages:{m['id']}:{json.dumps(hist[2:5], default=str)}"); meta = json.loads(hist[7] or "{}"); hist[7] = json.dumps({**meta, "history_of":m["id"], "superseded_at":datetime.now().isoformat()}); changed_msgs.add(hist[0]); conn.execute("INSERT INTO messages VALUES (?,?,?,?,?,?,?,?,?,?) ON CONFLICT DO NOTHING", hist)
-        conn.execute(_MSG_UPS, vals)
+    def bulk(sql, table, rows):  # a repeated id keeps its last row
+        if not rows: return
+        rows = list({x["id"]: x for x in rows}.values()); shape = {k: "VARCHAR" if (t := types[table, k]) == "JSON" else t for k in rows[0]}
+        cur(sql, [json.dumps(rows, default=_json_ts), json.dumps([shape])])
+    firsts = {}; [firsts.setdefault(c["id"], c) for c in r.convs]; bulk(_CONV_UPS, "conversations", list(firsts.values()))
+    for c in r.convs: firsts[c["id"]] is c or bulk(_CONV_UPS, "conversations", [c])  # a repeated conversation merges into the stored row
+    revised = {m["id"] for m in r.msgs if m["id"] in old_msgs} & changed_msgs
+    hist = cur(f"SELECT * FROM messages WHERE {_IN_IDS}", [json.dumps(sorted(revised))]) if revised else None; cols = [d[0] for d in hist.description] if hist else []
+    hist = [{**h, "id": gen_id("history", f"messages:{h['id']}:{json.dumps([h['role'], h['content'], h['thinking']], default=str)}"), "metadata": json.dumps({**json.loads(h["metadata"] or "{}"), "history_of":h["id"], "superseded_at":datetime.now().isoformat()})} for h in (dict(zip(cols, x)) for x in (hist.fetchall() if hist else []))]
+    changed_msgs.update(h["id"] for h in hist); bulk(f"INSERT INTO messages {_ROWS} ON CONFLICT DO NOTHING", "messages", hist)
+    bulk(_MSG_UPS, "messages", r.msgs)
     def replace_preserving(table, rows):
         if not rows: return
-        ids = [r["id"] for r in rows]; old = {x[0]: x for x in cur(f"SELECT * FROM {table} WHERE id IN ({','.join(['?']*len(ids))})", ids).fetchall()}
+        old = {x[0]: x for x in cur(f"SELECT * FROM {table} WHERE {_IN_IDS}", [ids(rows)]).fetchall()}
         for r in rows:
             vals = list(r.values())
             skip = {"tool_calls":7, "attachments":7, "artifacts":6, "file_edits":5}[table]; prev = old.get(r["id"]); payload = lambda x: tuple(v for i, v in enumerate(x) if i not in (0, skip))
             if prev and payload(prev) != payload(vals): hist = list(prev); hist[0] = gen_id("history", f"{table}:{r['id']}:{json.dumps(payload(hist), default=str)}"); cur(f"INSERT INTO {table} VALUES ({','.join(['?']*len(hist))}) ON CONFLICT DO NOTHING", hist)
-            cur(f"INSERT OR REPLACE INTO {table} VALUES ({','.join(['?']*len(vals))})", vals)
+        bulk(f"INSERT OR REPLACE INTO {table} {_ROWS}", table, rows)
     [replace_preserving(t, rows) for t, rows in (("tool_calls", r.tools), ("attachments", r.attachs), ("artifacts", r.artifacts), ("file_edits", r.edits))]
     return len(r.convs), len(r.msgs), len(r.tools), len(r.attachs), len(r.edits), len(new_convs), len(updated), changed_msgs
 
@@ -702,7 +701,7 @@ def embed_texts(ss: list[str], doc: bool = False, local_only=False) -> list[list
 def embed_text(s: str, doc: bool = False, local_only=False) -> list[float]: return embed_texts([s], doc, local_only)[0]
 def embed_pending(batch: int = 32, ids=None, local_only=False):
     if ids == []: return
-    Q = "FROM messages WHERE embedding IS NULL AND content IS NOT NULL AND content != ''" + _NOISE + (f" AND id IN ({','.join(['?']*len(ids))})" if ids is not None else ""); ps = ids or []
+    Q = "FROM messages WHERE embedding IS NULL AND content IS NOT NULL AND content != ''" + _NOISE + (f" AND {_IN_IDS}" if ids is not None else ""); ps = [json.dumps(ids)] if ids is not None else []
     conn = get_db(read_only=True); n = conn.execute(f"SELECT COUNT(*) {Q}", ps).fetchone()[0]; conn.close()
     if not n: return
     typer.echo(f"Embedding {n} messages...", err=True); done = 0
@@ -752,18 +751,18 @@ def _fts_ro(hybrid=False):
     return c
 def _filt(source, days, role, cwd=None, conversation=None):
     w, p = [], []
-    [(w.append(q),p.append(v)) for v,q in ((source,"c.source = ?"),(datetime.now()-timedelta(days=days) if days else None,"m.created_at > ?"),(role,"m.role = ?")) if v]
+    [(w.append(q),p.append(v)) for v,q in ((source,"c.source = ?"),(days,"m.created_at > localtimestamp - to_days(?)"),(role,"m.role = ?")) if v]
     if cwd: raw,resolved=map(str,(Path(cwd).expanduser().absolute(),Path(cwd).expanduser().resolve())); w.append("(c.cwd=? OR starts_with(c.cwd,?) OR c.cwd=? OR starts_with(c.cwd,?))"); p.extend((raw,raw.rstrip("/")+"/",resolved,resolved.rstrip("/")+"/"))
     if conversation: w.append("starts_with(c.id,?)"); p.append(conversation)
     return w, p
 def _clip(s, n): return (s or "")[:n] + ("..." if s and len(s) > n else "")
 def _fmt_hit(content, ts, role, title, src, cid, cwd, q, ctx, meta):
     p = _clip(content, ctx)
-    for w in q.split(): p = re.sub(f"({re.escape(w)})", r"\033[1;33m\1\033[0m", p, flags=re.I)
-    typer.echo(f"\n{'='*60}\n[{src}] {title or 'Untitled'}{f' @ {cwd}' if cwd else ''} ({cid[:8]})\n{role} @ {ts or '?'} ({meta})\n{'-'*40}\n{p}")
+    if words := sorted(set(q.split()), key=len, reverse=True): p = re.sub("|".join(map(re.escape, words)), lambda m: f"\033[1;33m{m.group()}\033[0m", p, flags=re.I)  # one pass: never re-highlights inside escape codes
+    return f"\n{'='*60}\n[{src}] {title or 'Untitled'}{f' @ {cwd}' if cwd else ''} ({cid[:8]})\n{role} @ {ts or '?'} ({meta})\n{'-'*40}\n{p}"
 
 def emit(data, fmt):
-    if fmt == "jsonl" and isinstance(data, list): [typer.echo(json.dumps(r, default=str)) for r in data]
+    if fmt == "jsonl" and isinstance(data, list): data and typer.echo("\n".join(json.dumps(r, default=str) for r in data))  # one write+flush, not one per row
     else: typer.echo(json.dumps(data, default=str))
 
 @app.command("hook", hidden=True)
@@ -792,10 +791,8 @@ def search(query: str, source: Optional[str] = typer.Option(None, "-s"), days: O
     conn.close()
     if fmt != "text": emit([dict(message_id=mid, role=r, content=_clip(content, context), thinking=_clip(think, context) if thinking and think else None, created_at=ts, score=score, title=title, source=src, conversation_id=cid, cwd=cwd) for mid, content, think, r, ts, score, title, src, cid, cwd in results], fmt); return
     if not results: typer.echo("No results"); return
-    for _, content, think, r, ts, score, title, src, cid, cwd in results:
-        _fmt_hit(content, ts, r, title, src, cid, cwd, query, context, f"score: {score:.2f}")
-        if thinking and think: typer.echo(f"\n[THINKING]\n{_clip(think, context)}")
-    typer.echo(f"\n{len(results)} results")
+    typer.echo("\n".join(_fmt_hit(content, ts, r, title, src, cid, cwd, query, context, f"score: {score:.2f}") + (f"\n\n[THINKING]\n{_clip(think, context)}" if thinking and think else "")
+                          for _, content, think, r, ts, score, title, src, cid, cwd in results) + f"\n\n{len(results)} results")  # one write for all hits
 
 @app.command("read")
 def read_cmd(conversation: str, limit: int = typer.Option(20, "-n", min=1), context: int = typer.Option(2000, "-c", min=1), around: Optional[str] = typer.Option(None, "--around", "-a"), thinking: bool = typer.Option(False, "--thinking", "-t"), fmt: str = typer.Option("text", "-f", "--format")):
@@ -813,7 +810,7 @@ def read_cmd(conversation: str, limit: int = typer.Option(20, "-n", min=1), cont
     data = [dict(id=mid, role=role, content=_clip(content, context), thinking=_clip(think, context) if thinking and think else None, created_at=ts) for mid, role, content, think, ts in rows]
     if fmt != "text": emit(data, fmt); return
     typer.echo(f"[{src}] {title or 'Untitled'}{f' @ {cwd}' if cwd else ''} ({cid})")
-    [typer.echo(f"\n{m['role']} @ {m['created_at'] or '?'}\n{m['content']}{f'''\n[THINKING]\n{m['thinking']}''' if m['thinking'] else ''}") for m in data]; typer.echo(f"\n{len(data)} messages")
+    data and typer.echo("\n".join(f"\n{m['role']} @ {m['created_at'] or '?'}\n{m['content']}{f'''\n[THINKING]\n{m['thinking']}''' if m['thinking'] else ''}" for m in data)); typer.echo(f"\n{len(data)} messages")
 
 def hybrid_hits(q, source=None, days=None, role=None, limit=10, local_only=False, cwd=None, conversation=None):
     drain_hooks(embed=True, local_only=local_only); conn = _fts_ro(True)
@@ -835,8 +832,7 @@ def query_cmd(q: str, source: Optional[str] = typer.Option(None, "-s"), days: Op
     except ValueError as e: typer.echo(str(e), err=True); return
     if not rows: typer.echo("No results"); return
     if fmt != "text": emit([{**r,"content":_clip(r["content"],context)} for r in rows], fmt); return
-    for x in rows: _fmt_hit(x["content"], x["created_at"], x["role"], x["title"], x["source"], x["conversation_id"], x["cwd"], q, context, f"score: {x['score']:.4f}")
-    typer.echo(f"\n{len(rows)} results")
+    typer.echo("\n".join(_fmt_hit(x["content"], x["created_at"], x["role"], x["title"], x["source"], x["conversation_id"], x["cwd"], q, context, f"score: {x['score']:.4f}") for x in rows) + f"\n\n{len(rows)} results")
 
 @app.command("embed")
 def embed_cmd(batch: int = typer.Option(32, "-b")):
@@ -918,21 +914,22 @@ def export(output: Path, fmt: str = typer.Option("json", "-f"), source: Optional
     if (conn := _ro()) is None: return
     where, params = ("WHERE c.source = ?", [source]) if source else ("", [])
     if fmt == "json":
+        def grouped(cols, tables, order=""):  # one query per table for the whole export, grouped by conversation in Python
+            out = {}
+            for x in conn.execute(f"SELECT m.conversation_id, {cols} FROM {tables} JOIN conversations c ON m.conversation_id = c.id {where} {order}", params).fetchall(): out.setdefault(x[0], []).append(x[1:])
+            return out
+        msgs = grouped("m.role, m.content, m.thinking, m.created_at, m.model", "messages m", "ORDER BY m.conversation_id, m.created_at")
+        tcs = grouped("tc.tool_name, tc.input, tc.output, tc.status", "tool_calls tc JOIN messages m ON tc.message_id = m.id")
+        edits = grouped("fe.file_path, fe.edit_type, fe.content", "file_edits fe JOIN messages m ON fe.message_id = m.id")
         rows = conn.execute(f"SELECT c.id, c.source, c.title, c.created_at, c.updated_at, c.model, c.cwd, c.git_branch, c.project_id FROM conversations c {where}", params).fetchall()
-        result = []
-        for r in rows:
-            msgs = [dict(role=m[0], content=m[1], thinking=m[2], created_at=str(m[3]) if m[3] else None, model=m[4])
-                   for m in conn.execute("SELECT role, content, thinking, created_at, model FROM messages WHERE conversation_id = ? ORDER BY created_at", [r[0]]).fetchall()]
-            tcs = [dict(tool=t[0], input=json.loads(t[1]), output=json.loads(t[2]), status=t[3])
-                  for t in conn.execute("SELECT tool_name, input, output, status FROM tool_calls tc JOIN messages m ON tc.message_id = m.id WHERE m.conversation_id = ?", [r[0]]).fetchall()]
-            edits = [dict(file=e[0], type=e[1], content=e[2])
-                    for e in conn.execute("SELECT fe.file_path, fe.edit_type, fe.content FROM file_edits fe JOIN messages m ON fe.message_id = m.id WHERE m.conversation_id = ?", [r[0]]).fetchall()]
-            result.append(dict(id=r[0], source=r[1], title=r[2], created_at=str(r[3]) if r[3] else None, updated_at=str(r[4]) if r[4] else None,
-                              model=r[5], cwd=r[6], git_branch=r[7], project_id=r[8], messages=msgs, tool_calls=tcs, file_edits=edits))
-        output.write_text(json.dumps(result, indent=2))
+        result = [dict(id=r[0], source=r[1], title=r[2], created_at=str(r[3]) if r[3] else None, updated_at=str(r[4]) if r[4] else None, model=r[5], cwd=r[6], git_branch=r[7], project_id=r[8],
+                       messages=[dict(role=m[0], content=m[1], thinking=m[2], created_at=str(m[3]) if m[3] else None, model=m[4]) for m in msgs.get(r[0], [])],
+                       tool_calls=[dict(tool=t[0], input=json.loads(t[1]), output=json.loads(t[2]), status=t[3]) for t in tcs.get(r[0], [])],
+                       file_edits=[dict(file=e[0], type=e[1], content=e[2]) for e in edits.get(r[0], [])]) for r in rows]
+        with output.open("w") as f: json.dump(result, f, indent=2)
     else:
         cur = conn.execute(f"SELECT c.id, c.source, c.title, c.cwd, m.role, m.content, m.created_at FROM conversations c JOIN messages m ON c.id = m.conversation_id {where} ORDER BY c.created_at, m.created_at", params)
-        with output.open("w", newline="") as f: w = csv.writer(f); w.writerow([d[0] for d in cur.description]); w.writerows(cur.fetchall())
+        with output.open("w", newline="") as f: w = csv.writer(f); w.writerow([d[0] for d in cur.description]); [w.writerows(rows) for rows in iter(lambda: cur.fetchmany(10000), [])]  # stream: never hold every message row at once
     conn.close(); typer.echo(f"Exported to {output}")
 
 @app.command()
@@ -947,14 +944,13 @@ def sync(watch: bool = typer.Option(False, "-w"), interval: int = typer.Option(3
     def plan_local(name, path, parser):
         if not path.exists(): return None
         if name in ("codex", "claude-code"):
-            files = [p for p in path.rglob("*.jsonl")]
-            prev, mt = local.get(name, {}).get("files", {}), {str(p): p.stat().st_mtime for p in files}
-            if not (chg := files if full else [p for p in files if mt.get(str(p), 0) > prev.get(str(p), 0)]): return None
+            prev, mt = local.get(name, {}).get("files", {}), file_mtimes(path)
+            if not (chg := [Path(p) for p, t in mt.items() if full or t > prev.get(p, 0)]): return None
             return dict(name=name, label=name.replace("-", " ").title(), source=name, func=lambda p=path, fs=chg: parser(p, fs), state=("local", name, {"files": mt}))
         mtime = latest_mtime(path)
         if not full and mtime <= local.get(name, {}).get("mtime", 0): return None
         return dict(name=name, label=name.replace("-", " ").title(), source=name, func=lambda p=path: parser(p), state=("local", name, {"mtime": mtime}))
-    def probe_chatgpt(browser):
+    def probe_chatgpt(browser, say):
         hosts = [("https://chatgpt.com", ["chatgpt.com"]), ("https://chat.openai.com", ["chat.openai.com", "openai.com"])]
         profiles = chatgpt_profiles(browser)
         errors, heads, ok, frontiers, accounts = [], [], [], {}, set()
@@ -968,9 +964,9 @@ def sync(watch: bool = typer.Option(False, "-w"), interval: int = typer.Option(3
                 if items and (not account or account not in accounts): item = items[0]; heads.append(f"{profile or 'default'}:{item['id']}:{item.get('update_time')}"); ok.append(profile); frontiers[profile or "default"] = {"account":account,"updated":item.get("update_time"),"id":item["id"]}; account and accounts.add(account)
             except Exception as e:
                 errors.append(f"chatgpt.com{f'/{profile}' if profile else ''}: {e}")
-        if heads: errors and typer.echo("chatgpt profiles skipped: " + " | ".join(errors), err=True); chatgpt_ok[browser], chatgpt_frontiers[browser] = ok, frontiers; return "|".join(heads)
+        if heads: errors and say("chatgpt profiles skipped: " + " | ".join(errors), err=True); chatgpt_ok[browser], chatgpt_frontiers[browser] = ok, frontiers; return "|".join(heads)
         raise ValueError(f"ChatGPT request failed in {browser}: " + " | ".join(errors)) if errors else ValueError("ChatGPT request failed")
-    def probe_claude(browser):
+    def probe_claude(browser, say):
         cookies = get_cookies("claude.ai", browser)
         if not cookies: raise ValueError(f"No Claude cookies found in {browser}")
         headers = {"Origin": "https://claude.ai", "Referer": "https://claude.ai/",
@@ -983,14 +979,14 @@ def sync(watch: bool = typer.Option(False, "-w"), interval: int = typer.Option(3
         items = fetch_json(f"https://claude.ai/api/organizations/{org_id}/chat_conversations", cookies, headers)
         if not items: return None
         return f"{(item := items[0])['uuid']}:{item.get('updated_at') or item.get('created_at')}"
-    def plan_web(name, fetcher, probe, known=None, sink=None, legacy=None):
+    def plan_web(name, fetcher, probe, known=None, sink=None, legacy=None, say=typer.echo):
         pref = web.get(name, {})
         forced = os.environ.get(f"CONVOS_{name.upper()}_BROWSER")
         order = [forced] if forced else [pref.get("browser")] + [b for b in ("safari", "chrome") if b != pref.get("browser")]
         errors = []
         for b in [x for x in order if x]:
             try:
-                head = probe(b); lu = head.split(":", 1)[1] if (name == "claude" and head and ":" in head) else None
+                head = probe(b, say); lu = head.split(":", 1)[1] if (name == "claude" and head and ":" in head) else None
                 current = {**(pref.get("frontiers", {}) if b == pref.get("browser") else {}), **chatgpt_frontiers.get(b, {})} if name == "chatgpt" else None
                 st = {"browser": b, "head": head, **({"frontiers":current} if name == "chatgpt" else {"last_updated":lu} if lu else {})}
                 if name != "chatgpt" and head is not None and b == pref.get("browser") and head == pref.get("head") and not full:
@@ -1003,7 +999,7 @@ def sync(watch: bool = typer.Option(False, "-w"), interval: int = typer.Option(3
                 return dict(name=name, label=name.title(), source=name, func=func, state=("web", name, st), saved=saved)
             except Exception as e:
                 errors.append(f"{b}: {e}")
-        if errors: typer.echo(f"{name}: no cookies found -- skipped" if all("cookies" in e.lower() for e in errors) else f"{name} sync failed: " + " | ".join(errors))
+        if errors: say(f"{name}: no cookies found -- skipped" if all("cookies" in e.lower() for e in errors) else f"{name} sync failed: " + " | ".join(errors))
         return None
     def plan_import(path: Path):
         if not path.exists(): return None
@@ -1031,8 +1027,11 @@ def sync(watch: bool = typer.Option(False, "-w"), interval: int = typer.Option(3
             start("Claude Code", "claude-code"); jobs += [j for j in [plan_local("claude-code", p, parse_claude_code)] if j]
         if codex and (p := Path(os.environ.get("CODEX_HOME", Path.home()/".codex"))).exists():
             start("Codex", "codex"); jobs += [j for j in [plan_local("codex", p, parse_codex)] if j]
-        if not offline: start("ChatGPT", "chatgpt"); jobs += [j for j in [plan_web("chatgpt", fetch_chatgpt, probe_chatgpt, {} if full else known, checkpoint, legacy)] if j]
-        if not offline: start("Claude", "claude"); jobs += [j for j in [plan_web("claude", fetch_claude, probe_claude)] if j]
+        if not offline:  # the ChatGPT and Claude probes are independent round trips: overlap them, then report each under its own header
+            webs = [("ChatGPT", "chatgpt", fetch_chatgpt, probe_chatgpt, {} if full else known, checkpoint, legacy), ("Claude", "claude", fetch_claude, probe_claude)]
+            def plan_buffered(w): out = []; return plan_web(*w[1:], say=lambda *a, **k: out.append((a, k))), out
+            with ThreadPoolExecutor(2) as ex:
+                for w, (j, out) in zip(webs, ex.map(plan_buffered, webs)): start(w[0], w[1]); [typer.echo(*a, **k) for a, k in out]; jobs += [j] if j else []
         verbose and typer.echo(f"Planning took {time.perf_counter()-t0:.2f}s")
         if jobs:
             with ThreadPoolExecutor(max_workers=min(4, len(jobs))) as ex:
@@ -1061,11 +1060,15 @@ def sync(watch: bool = typer.Option(False, "-w"), interval: int = typer.Option(3
         sync_lock.close()
         verbose and typer.echo(f"Total sync time {time.perf_counter()-t0:.2f}s")
         return total, newc, updc
+    def scoped_sync():  # the cookie memo lives for one sync: a daemon re-reads expired cookies on its next pass
+        global _COOKIES; _COOKIES = {}
+        try: return do_sync()
+        finally: _COOKIES = None
     if watch:
         typer.echo(f"Daemon mode (interval: {interval}s)")
-        while True: r, n, u = do_sync(); typer.echo(f"[{datetime.now().isoformat()}] {n} new, {u} updated convs; {r[1]} msgs, {r[2]} tools, {r[3]} attachs, {r[4]} edits"); time.sleep(interval)
+        while True: r, n, u = scoped_sync(); typer.echo(f"[{datetime.now().isoformat()}] {n} new, {u} updated convs; {r[1]} msgs, {r[2]} tools, {r[3]} attachs, {r[4]} edits"); time.sleep(interval)
     else:
-        r, n, u = do_sync(); typer.echo(f"Updated {n} new, {u} updated convs; {r[1]} msgs, {r[2]} tools, {r[3]} attachs, {r[4]} edits processed")
+        r, n, u = scoped_sync(); typer.echo(f"Updated {n} new, {u} updated convs; {r[1]} msgs, {r[2]} tools, {r[3]} attachs, {r[4]} edits processed")
         fmt = lambda v: f"{v[0]} convs, {v[1]} msgs, {v[2]} tools, {v[3]} attachs, {v[4]} edits"; conn = get_db(read_only=True); total = [conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("conversations", "messages", "tool_calls", "attachments", "file_edits")]; conn.close(); typer.echo(f"Total: {fmt(total)}")
 
 @app.command()
@@ -1076,10 +1079,10 @@ def sql(query: str, fmt: str = typer.Option("text", "-f", "--format")):
     except Exception as e: conn.close(); typer.echo(f"Query failed: {e}", err=True); return
     conn.close()
     if fmt != "text": emit([dict(zip(cols, r)) for r in rows], fmt); return
-    typer.echo(" | ".join(cols)); [typer.echo(" | ".join("" if v is None else str(v) for v in r)) for r in rows]; typer.echo(f"\n{len(rows)} rows")
+    typer.echo("\n".join([" | ".join(cols)] + [" | ".join("" if v is None else str(v) for v in r) for r in rows])); typer.echo(f"\n{len(rows)} rows")
 
-# ---- plugin seam: installed apps register subcommands (entry point group convos.commands) ----
-for _ep in entry_points(group="convos.commands"):
+# ---- plugin seam: installed apps register subcommands (entry point group convos.commands); parse_sessions workers skip it ----
+for _ep in entry_points(group="convos.commands") if "CONVOS_PARSE_WORKER" not in os.environ else ():
     try: _ep.load()(app)
     except Exception as _e: typer.echo(f"plugin {_ep.name} failed: {_e}", err=True)  # a broken plugin must not kill the CLI
 
@@ -1,4 +1,16 @@
-import gc
+import gc, duckdb, pytest
 
 
 def pytest_runtest_teardown(): gc.collect()
+
+
+@pytest.fixture(scope="session")
+def shared_db():
+    from ai_convos.cli import init_schema
+    con = duckdb.connect(":memory:"); init_schema(con); yield con; con.close()
+
+
+@pytest.fixture
+def db(shared_db):
+    """Schema-ready in-memory connection; everything a test writes is rolled back."""
+    shared_db.execute("BEGIN"); yield shared_db; shared_db.execute("ROLLBACK")
@@ -89,6 +89,23 @@ def test_local_only_sync_imports_configured_agent_roots_without_web(hooks, tmp_p
     db=duckdb.connect(str(data/"convos.db"),read_only=True); rows=db.execute("SELECT source,content FROM conversations c JOIN messages m ON m.conversation_id=c.id").fetchall(); db.close()
     assert first.exit_code == second.exit_code == 0 and set(rows) == {("codex","offline codex history"),("claude-code","offline claude history")} and "2 new, 0 updated" in first.output and "0 new, 0 updated" in second.output
 
+def test_sync_probes_chatgpt_and_claude_concurrently(hooks, monkeypatch, capsys):
+    _, data = hooks; monkeypatch.setattr(cli, "STATE_PATH", data/"sync_state.json"); gate, met = __import__("threading").Barrier(2, timeout=5), []
+    def meet(*_):
+        try: met.append(gate.wait())
+        except __import__("threading").BrokenBarrierError: pass
+        return {}
+    monkeypatch.setattr(cli, "chatgpt_profiles", lambda _: meet() or []); monkeypatch.setattr(cli, "get_cookies", meet)
+    cli.sync(False, 300, False, False, False, False); assert len(met) >= 2
+    out = [l.split(" (")[0].split(":")[0] for l in capsys.readouterr().out.splitlines() if l.lower().startswith(("syncing c", "chatgpt", "claude"))]
+    assert out == ["Syncing ChatGPT", "chatgpt sync failed", "Syncing Claude", "claude"]  # each probe reports under its own header
+
+def test_cookie_memo_lives_for_one_sync(hooks, monkeypatch):
+    _, data = hooks; monkeypatch.setattr(cli, "STATE_PATH", data/"sync_state.json"); reads = []; read = lambda *_a, **_k: reads.append(cli._COOKIES is not None) or {}
+    monkeypatch.setattr(cli, "chatgpt_profiles", lambda _: []); monkeypatch.setattr(cli, "read_safari_cookies", read); monkeypatch.setattr(cli, "read_chrome_cookies", read)
+    cli.sync(False, 300, False, False, False, False); during = len(reads); cli.get_cookies("claude.ai"); cli.get_cookies("claude.ai")
+    assert during and all(reads[:during]) and reads[during:] == [False, False] and cli._COOKIES is None  # outside a sync every caller reads fresh cookies
+
 @pytest.mark.parametrize("stamp", [None, 100])
 def test_sync_rechecks_chatgpt_unchanged_head(hooks, monkeypatch, stamp):
     _, data = hooks; monkeypatch.setattr(cli, "STATE_PATH", data/"sync_state.json"); cli.atomic_json(cli.STATE_PATH, {"web":{"chatgpt":{"browser":"safari","head":f"default:c1:{stamp}"}}}); called = []
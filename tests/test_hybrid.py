@@ -85,6 +85,11 @@ def test_search_returns_one_hit_per_conversation(hybrid_db):
     assert len(hits) == 1 and hits[0]["conversation_id"] == "c1" and hits[0]["message_id"] in ("m1", "m3")
 
 
+def test_text_hit_highlights_every_term_once():
+    out = cli._fmt_hit("Apple pie and apple 1 m", None, "user", "T", "test", "c1", None, "apple 1 m", 100, "bm25")
+    assert "\033[1;33mApple\033[0m pie and \033[1;33mapple\033[0m \033[1;33m1\033[0m \033[1;33mm\033[0m" in out
+
+
 def test_search_structured_output_honors_context(hybrid_db):
     conn = duckdb.connect(str(hybrid_db)); conn.execute("UPDATE messages SET thinking='reasoning detail' WHERE id='m1'"); cli.rebuild_fts_index(conn); conn.close()
     r = CliRunner().invoke(cli.app, ["search", "cherry", "-c", "5", "-t", "-f", "json"]); hit = __import__("json").loads(r.output)[0]
@@ -121,6 +126,12 @@ def test_query_filters_candidates_and_skips_injected_boilerplate(tmp_path, monke
     assert [h["content"] for h in hits] == ["needle wanted"]
 
 
+def test_search_days_filter_uses_local_wall_clock(hybrid_db):
+    conn=duckdb.connect(str(hybrid_db)); conn.execute("UPDATE messages SET created_at=localtimestamp - INTERVAL 10 DAY WHERE id='m1'"); conn.execute("UPDATE messages SET created_at=localtimestamp - INTERVAL 1 HOUR WHERE id='m3'"); conn.close()
+    hits=__import__("json").loads(CliRunner().invoke(cli.app,["search","apple","-d","2","-f","json"]).output)
+    assert [h["message_id"] for h in hits]==["m3"]
+
+
 def test_search_and_query_have_direct_project_and_conversation_filters(hybrid_db,monkeypatch):
     conn=duckdb.connect(str(hybrid_db)); conn.execute("UPDATE conversations SET cwd='/repo/sub' WHERE id='c1'"); conn.execute("INSERT INTO conversations (id,source,title,cwd) VALUES ('c2','test','Other','/other')"); conn.execute("INSERT INTO messages (id,conversation_id,role,content,embedding) VALUES ('m6','c2','user','apple outside',?)",[_emb(1)]); cli.rebuild_fts_index(conn); conn.close()
     monkeypatch.setattr(cli,"embed_text",lambda s,doc=False:_emb(1)); runner=CliRunner()
@@ -258,3 +269,18 @@ def test_export_parameterizes_source_and_path(tmp_path, monkeypatch):
     conn.execute("INSERT INTO messages VALUES ('m1','c1','user','hello',NULL,NULL,NULL,NULL,NULL,NULL)"); conn.close()
     out = tmp_path / "quoted'out.csv"; r = CliRunner().invoke(cli.app, ["export", str(out), "-f", "csv", "-s", "quoted'source"])
     assert r.exit_code == 0 and "hello" in out.read_text()
+
+
+def test_export_json_groups_rows_per_conversation(tmp_path, monkeypatch):
+    db = tmp_path / "test.db"; monkeypatch.setattr(cli, "DB_PATH", db); monkeypatch.setattr(cli, "DATA_DIR", tmp_path)
+    conn = duckdb.connect(str(db)); cli.init_schema(conn)
+    for c, src in [("c1", "a"), ("c2", "a"), ("c3", "b")]: conn.execute("INSERT INTO conversations VALUES (?,?,'T',NULL,NULL,NULL,NULL,NULL,NULL,NULL)", [c, src])
+    for m, c, ts in [("m2", "c1", "2024-01-02"), ("m1", "c1", "2024-01-01"), ("m3", "c2", "2024-01-01"), ("m4", "c3", "2024-01-01")]:
+        conn.execute("INSERT INTO messages VALUES (?,?,'user',?,NULL,?,NULL,NULL,NULL,NULL)", [m, c, m, ts])
+    conn.execute("INSERT INTO tool_calls VALUES ('t1','m3','Bash','{\"cmd\":\"ls\"}','\"ok\"','complete',NULL,NULL)")
+    conn.execute("INSERT INTO file_edits VALUES ('e1','m1','/f','write','x',NULL,NULL)"); conn.close()
+    out = tmp_path / "out.json"; assert CliRunner().invoke(cli.app, ["export", str(out), "-s", "a"]).exit_code == 0
+    d = {c["id"]: c for c in __import__("json").loads(out.read_text())}
+    assert set(d) == {"c1", "c2"} and [m["content"] for m in d["c1"]["messages"]] == ["m1", "m2"] and [m["content"] for m in d["c2"]["messages"]] == ["m3"]
+    assert d["c1"]["tool_calls"] == [] and d["c2"]["tool_calls"] == [dict(tool="Bash", input={"cmd": "ls"}, output="ok", status="complete")]
+    assert d["c1"]["file_edits"] == [dict(file="/f", type="write", content="x")] and d["c2"]["file_edits"] == []
@@ -16,27 +16,21 @@ EXPECTED_SCHEMAS = {
         "properties": {"chat_messages": {"type": "array"}}},
 }
 
-def validate_schema(data, schema_name):
-    schema = EXPECTED_SCHEMAS.get(schema_name)
-    if not schema:
-        return False, f"Unknown schema: {schema_name}"
-    if schema["type"] == "array":
-        if not isinstance(data, list):
-            return False, f"Expected array, got {type(data).__name__}"
-        if data and "items" in schema and "required" in schema["items"]:
-            for i, item in enumerate(data[:3]):
-                for field in schema["items"]["required"]:
-                    if field not in item:
-                        return False, f"Item {i} missing required field: {field}"
-        return True, "OK"
-    if schema["type"] == "object":
-        if not isinstance(data, dict):
-            return False, f"Expected object, got {type(data).__name__}"
-        for field in schema.get("required", []):
-            if field not in data:
-                return False, f"Missing required field: {field}"
+def compile_schema(schema):
+    """Build a checker for one EXPECTED_SCHEMAS entry once, instead of re-walking the schema per call."""
+    kind, required, item_required = {"array": list, "object": dict}[schema["type"]], frozenset(schema.get("required", ())), frozenset(schema.get("items", {}).get("required", ()))
+    def check(data):
+        if not isinstance(data, kind): return False, f"Expected {schema['type']}, got {type(data).__name__}"
+        if missing := required - data.keys() if required else None: return False, f"Missing required field: {min(missing)}"
+        if bad := next(((i, min(item_required - item.keys())) for i, item in enumerate(data) if not item_required <= item.keys()), None) if item_required else None:
+            return False, f"Item {bad[0]} missing required field: {bad[1]}"
         return True, "OK"
-    return False, f"Unknown schema type: {schema['type']}"
+    return check
+
+VALIDATORS = {name: compile_schema(schema) for name, schema in EXPECTED_SCHEMAS.items()}
+
+def validate_schema(data, schema_name):
+    return VALIDATORS[schema_name](data) if schema_name in VALIDATORS else (False, f"Unknown schema: {schema_name}")
 
 # Skip all integration tests if SKIP_INTEGRATION is set
 pytestmark = pytest.mark.skipif(
@@ -161,7 +155,29 @@ class TestChatGPTAPI:
             details.append(url.rsplit("/",1)[-1])
             return {"mapping":{}}
         monkeypatch.setattr(cli,"fetch_json",fake); monkeypatch.setattr(cli.time,"monotonic",lambda:clock[0]); monkeypatch.setattr(cli.time,"sleep",lambda n:(sleeps.append(n),clock.__setitem__(0,clock[0]+n))); cli.fetch_chatgpt("safari")
-        assert details==[str(i) for i in range(21)] and sleeps==pytest.approx([1.875,1.875])
+        assert sorted(details,key=int)==[str(i) for i in range(21)] and sleeps==pytest.approx([1.875,1.875])
+
+    def test_fetch_chatgpt_overlaps_detail_requests(self, monkeypatch):
+        import threading
+        from ai_convos import cli
+        monkeypatch.setattr(cli,"chatgpt_profiles",lambda _:[None]); monkeypatch.setattr(cli,"chatgpt_cookie_base",lambda *a,**k:({},"https://chatgpt.com")); monkeypatch.setattr(cli,"chatgpt_headers",lambda *a,**k:{}); barrier = threading.Barrier(4, timeout=5)
+        def fake(url,*a,**k):
+            if "/conversations?" in url: return {"items":[{"id":str(i),"update_time":i} for i in range(8)],"total":8}
+            barrier.wait(); return {"mapping":{}}
+        monkeypatch.setattr(cli,"fetch_json",fake)
+        assert len(cli.fetch_chatgpt("safari").convs) == 8
+
+    def test_fetch_chatgpt_429_pauses_every_worker(self, monkeypatch):
+        import threading
+        from ai_convos import cli
+        monkeypatch.setattr(cli,"chatgpt_profiles",lambda _:[None]); monkeypatch.setattr(cli,"chatgpt_cookie_base",lambda *a,**k:({},"https://chatgpt.com")); monkeypatch.setattr(cli,"chatgpt_headers",lambda *a,**k:{}); limited, sleeps, clock, starts = threading.Event(), [], [0], {}
+        def fake(url,*a,**k):
+            if "/conversations?" in url: k["before_request"](); return {"items":[{"id":str(i),"update_time":i} for i in range(4)],"total":4}
+            if url.endswith("/0"): k["before_request"](); k["on_rate_limit"](300); limited.set()
+            else: limited.wait(5)
+            k["before_request"](); starts[url.rsplit("/",1)[-1]] = clock[0]; return {"mapping":{}}
+        monkeypatch.setattr(cli,"fetch_json",fake); monkeypatch.setattr(cli.time,"monotonic",lambda:clock[0]); monkeypatch.setattr(cli.time,"sleep",lambda n:(sleeps.append(n),clock.__setitem__(0,clock[0]+n))); cli.fetch_chatgpt("safari")
+        assert sleeps == [300] and starts == {str(i): 300 for i in range(4)}
 
     @pytest.mark.parametrize("shared,expected", [(True,2),(False,0)])
     def test_fetch_chatgpt_rate_budget_is_account_scoped(self, monkeypatch, shared, expected):
@@ -303,6 +319,29 @@ class TestClaudeAPI:
         monkeypatch.setattr(cli, "fetch_json", fake)
         with pytest.raises(TimeoutError, match="detail timeout"): cli.fetch_claude("safari")
 
+    def test_fetch_claude_fetches_repeated_listing_once(self, monkeypatch):
+        from ai_convos import cli
+        monkeypatch.setattr(cli, "get_cookies", lambda *_: {"session":"x"}); details = []
+        def fake(url, *a, **k):
+            if url.endswith("/api/organizations"): return [{"uuid":"org"}]
+            if url.endswith("/chat_conversations"): return [{"uuid":"a"}, {"uuid":"b"}, {"uuid":"a"}]
+            details.append(url.rsplit("/", 1)[-1]); return {"chat_messages":[]}
+        monkeypatch.setattr(cli, "fetch_json", fake)
+        assert [c["id"] for c in cli.fetch_claude("safari").convs] == [cli.gen_id("claude", "a"), cli.gen_id("claude", "b")] and sorted(details) == ["a", "b"]
+
+    def test_fetch_claude_paces_requests_and_counts_progress_against_todo(self, monkeypatch, capsys):
+        from datetime import datetime
+        from ai_convos import cli
+        monkeypatch.setattr(cli, "get_cookies", lambda *_: {"session":"x"}); sleeps, clock = [], [0]
+        items = [{"uuid":f"n{i}", "updated_at":"2024-02-01T00:00:00"} for i in range(21)] + [{"uuid":f"o{i}", "updated_at":"2023-01-01T00:00:00"} for i in range(2)]
+        def fake(url, *a, **k):
+            k["before_request"]()
+            if url.endswith("/api/organizations"): return [{"uuid":"org"}]
+            return items if url.endswith("/chat_conversations") else {"chat_messages":[]}
+        monkeypatch.setattr(cli, "fetch_json", fake); monkeypatch.setattr(cli.time,"monotonic",lambda:clock[0]); monkeypatch.setattr(cli.time,"sleep",lambda n:(sleeps.append(n),clock.__setitem__(0,clock[0]+n)))
+        assert len(cli.fetch_claude("safari", since=datetime(2024, 1, 1)).convs) == 21
+        assert sleeps == pytest.approx([0.5]*3) and "claude fetched 21/21" in capsys.readouterr().out
+
     @pytest.mark.integration
     def test_organizations_schema(self):
         """Verify /api/organizations returns expected schema."""
@@ -320,6 +359,11 @@ class TestClaudeAPI:
         assert not valid
         assert "uuid" in msg
 
+    def test_conversations_list_checks_every_item(self):
+        """Drift in any listed item is caught, not only in the first few."""
+        valid, msg = validate_schema([{"uuid": f"c{i}"} for i in range(5)] + [{"id": "c5"}], "claude_conversations")
+        assert not valid and msg == "Item 5 missing required field: uuid"
+
     @pytest.mark.integration
     def test_conversations_list_schema(self):
         """Verify /api/organizations/{id}/chat_conversations returns expected schema."""
@@ -361,28 +405,46 @@ class TestClaudeAPI:
 class TestCookieExtraction:
     """Tests for browser cookie extraction."""
 
-    def test_safari_cookies_not_found(self):
+    def test_safari_cookies_not_found(self, tmp_path, monkeypatch):
         """Safari cookie function handles missing file gracefully."""
-        from ai_convos.cli import read_safari_cookies
-        with patch("pathlib.Path.exists", return_value=False):
-            cookies = read_safari_cookies("example.com")
-            assert cookies == {}
+        from ai_convos import cli
+        monkeypatch.setattr(cli.Path, "home", classmethod(lambda cls: tmp_path))
+        assert cli.read_safari_cookies("example.com") == {}
 
-    def test_chrome_cookies_not_found(self):
+    def test_safari_binarycookies_parsed(self, tmp_path, monkeypatch):
+        """Cookies are read from every page; domain matching is suffix-tolerant both ways."""
+        import struct
+        from ai_convos import cli
+        def cookie(domain, name, value):
+            strs = b"".join(x.encode() + b"\x00" for x in (domain, name, "/", value)); offs = [56]
+            for x in (domain, name, "/"): offs.append(offs[-1] + len(x) + 1)
+            return struct.pack("<4I4I", 56 + len(strs), 0, 0, 0, *offs) + b"\x00" * 24 + strs
+        def page(*cookies):
+            head = 8 + 4 * len(cookies) + 4; offs = [head]
+            for c in cookies[:-1]: offs.append(offs[-1] + len(c))
+            return b"\x00\x00\x01\x00" + struct.pack(f"<I{len(cookies)}I", len(cookies), *offs) + b"\x00" * 4 + b"".join(cookies)
+        pages = [page(cookie(".claude.ai", "sessionKey", "sk"), cookie("example.com", "other", "x")), page(cookie("chatgpt.com", "token", "t"))]
+        path = tmp_path / "Library/Cookies/Cookies.binarycookies"; path.parent.mkdir(parents=True)
+        path.write_bytes(b"cook" + struct.pack(f">I{len(pages)}I", len(pages), *map(len, pages)) + b"".join(pages))
+        monkeypatch.setattr(cli.Path, "home", classmethod(lambda cls: tmp_path))
+        assert cli.read_safari_cookies("claude.ai") == {"sessionKey": "sk"}
+        assert cli.read_safari_cookies("chatgpt.com") == {"token": "t"}
+        assert cli.safari_cookie_domains() == {".claude.ai", "example.com", "chatgpt.com"}
+
+    def test_chrome_cookies_not_found(self, tmp_path, monkeypatch):
         """Chrome cookie function handles missing file gracefully."""
-        from ai_convos.cli import read_chrome_cookies
-        with patch("pathlib.Path.exists", return_value=False):
-            cookies = read_chrome_cookies("example.com")
-            assert cookies == {}
+        from ai_convos import cli
+        monkeypatch.setattr(cli.Path, "home", classmethod(lambda cls: tmp_path))
+        assert cli.read_chrome_cookies("example.com") == {}
 
-    def test_chrome_keychain_failure(self):
+    def test_chrome_keychain_failure(self, tmp_path, monkeypatch):
         """Chrome cookies handles keychain access failure."""
-        from ai_convos.cli import read_chrome_cookies
-        with patch("pathlib.Path.exists", return_value=True):
-            with patch("subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock(returncode=1)
-                cookies = read_chrome_cookies("example.com")
-                assert cookies == {}
+        from ai_convos import cli
+        cdir = tmp_path / "Library/Application Support/Google/Chrome/Default"; cdir.mkdir(parents=True); (cdir / "Cookies").touch()
+        monkeypatch.setattr(cli.Path, "home", classmethod(lambda cls: tmp_path))
+        with patch("subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=1)
+            assert cli.read_chrome_cookies("example.com") == {}
 
     def test_chrome_cookies_strip_v10_prefix(self, tmp_path, monkeypatch):
         """Recent Chrome prepends a 32-byte hash to each decrypted cookie; strip it (legacy unprefixed values stay intact)."""
@@ -426,13 +488,9 @@ class TestDeduplication:
         id2 = gen_id("chatgpt", "conv-123")
         assert id1 != id2
 
-    def test_upsert_updates_existing(self, tmp_path):
+    def test_upsert_updates_existing(self, db):
         """Upserting same conversation updates rather than duplicates."""
-        import duckdb
-        from ai_convos.cli import init_schema, upsert, ParseResult, gen_id
-
-        db = duckdb.connect(str(tmp_path / "test.db"))
-        init_schema(db)
+        from ai_convos.cli import upsert, ParseResult, gen_id
 
         # First insert
         r1 = ParseResult()
@@ -462,15 +520,47 @@ class TestDeduplication:
         assert conv_count == 1, "Should have exactly 1 conversation"
         assert msg_count == 2, "Should have 2 messages"
         assert title == "Updated", "Title should be updated"
-        db.close()
 
-    def test_continued_conversation_no_duplicate(self, tmp_path):
-        """Conversation continued on web and re-synced doesn't create duplicates."""
+    def test_upsert_batches_rows_and_keeps_last_repeated_id(self, db):
+        """A large batch lands whole in one upsert; a repeated id keeps its last row."""
+        from ai_convos.cli import upsert, ParseResult
+
+        msg = lambda i, text: dict(id=f"m{i}", conversation_id="c", role="user", content=text, thinking=None,
+                                   created_at=None, model=None, metadata="{}", parent_id=None)
+        tool = lambda i, out: dict(id=f"t{i}", message_id="m0", tool_name="Bash", input="{}", output=out, status="complete", duration_ms=None, created_at=None)
+        r = ParseResult(convs=[dict(id="c", source="codex", title="T", created_at=None, updated_at=None, model=None, cwd=None,
+                                    git_branch=None, project_id=None, metadata="{}")],
+                        msgs=[msg(i, f"text {i}") for i in range(1201)] + [msg(0, "final")],
+                        tools=[tool(i, "{}") for i in range(600)] + [tool(0, '"final"')])
+        upsert(db, r)
+
+        assert db.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 1201
+        assert db.execute("SELECT content FROM messages WHERE id = 'm0'").fetchone()[0] == "final"
+        assert db.execute("SELECT COUNT(*), MAX(output) FILTER (WHERE id = 't0') FROM tool_calls").fetchone() == (600, '"final"')
+
+    def test_upsert_merges_repeated_conversation_in_one_batch(self, db):
+        """A conversation listed twice in one batch keeps the earliest start and latest update."""
+        from datetime import datetime, timezone
+        from ai_convos.cli import upsert, ParseResult
+
+        conv = lambda start, end, model: dict(id="c", source="chatgpt", title="T", created_at=datetime(2024, 1, start, tzinfo=timezone.utc),
+                                              updated_at=datetime(2024, 1, end, tzinfo=timezone.utc), model=model, cwd=None, git_branch=None, project_id=None, metadata="{}")
+        first = upsert(db, ParseResult(convs=[conv(2, 3, "gpt-4o"), conv(1, 2, None)]))
+        assert first[5] == 1
+        assert db.execute("SELECT COUNT(*), MIN(model) FROM conversations").fetchone() == (1, "gpt-4o")
+        assert db.execute("SELECT created_at < updated_at, date_diff('day', created_at, updated_at) FROM conversations").fetchone() == (True, 2)
+
+    @pytest.mark.parametrize("field,value", [("size", 2**40), ("size", "big"), ("created_at", "yesterday")])
+    def test_upsert_rejects_values_that_do_not_fit_the_column(self, db, field, value):
+        """An out-of-range or wrongly typed value fails the batch instead of landing as NULL."""
         import duckdb
-        from ai_convos.cli import init_schema, upsert, ParseResult, gen_id
+        from ai_convos.cli import upsert, ParseResult
+        att = dict(id="a", message_id="m", filename="f.txt", mime_type=None, size=1, path=None, url=None, created_at=None)
+        with pytest.raises(duckdb.Error): upsert(db, ParseResult(attachs=[{**att, field: value}]))
 
-        db = duckdb.connect(str(tmp_path / "test.db"))
-        init_schema(db)
+    def test_continued_conversation_no_duplicate(self, db):
+        """Conversation continued on web and re-synced doesn't create duplicates."""
+        from ai_convos.cli import upsert, ParseResult, gen_id
 
         # Simulate: conversation started locally
         r1 = ParseResult()
@@ -501,7 +591,6 @@ class TestDeduplication:
 
         assert conv_count == 1, "Should still have exactly 1 conversation"
         assert msg_count == 6, "Should have 6 messages (no duplicates)"
-        db.close()
 
 
 # ---- HTTP Error Handling Tests ----
@@ -535,6 +624,14 @@ class TestHTTPErrors:
                 fetch_json("https://api.example.com", {"session": "test"})
             assert exc_info.value.code == 401
 
+    @pytest.mark.parametrize("code,sleeps", [(401,0),(404,0),(500,1),(503,1)])
+    def test_only_transient_errors_are_retried(self, code, sleeps):
+        from ai_convos.cli import fetch_json
+        import urllib.error
+        with patch("urllib.request.urlopen", side_effect=urllib.error.HTTPError("https://api.example.com", code, "x", {}, None)) as urlopen, patch("time.sleep") as sleep:
+            with pytest.raises(urllib.error.HTTPError): fetch_json("https://api.example.com", {})
+        assert sleep.call_count == sleeps and urlopen.call_count == sleeps+1
+
     @pytest.mark.parametrize("headers,delay", [({},300),({"Retry-After":"420"},420)])
     def test_429_uses_visible_long_backoff(self, headers, delay):
         from ai_convos.cli import fetch_json
@@ -543,3 +640,6 @@ class TestHTTPErrors:
         with patch("urllib.request.urlopen", side_effect=error), patch("time.sleep") as sleep:
             with pytest.raises(urllib.error.HTTPError): fetch_json("https://api.example.com", {}, retries=2, before_request=before, rate_limit_backoff=300)
         assert [x.args[0] for x in sleep.call_args_list] == [delay,delay] and before.call_count == 3
+        with patch("urllib.request.urlopen", side_effect=error), patch("time.sleep") as sleep:
+            with pytest.raises(urllib.error.HTTPError): fetch_json("https://api.example.com", {}, retries=1, before_request=before, rate_limit_backoff=300, on_rate_limit=(block := MagicMock()))
+        assert block.call_args.args == (delay,) and not sleep.called  # the shared limiter owns the wait
@@ -1,6 +1,6 @@
 """Tests for local file format parsers."""
 
-import pytest, json, tempfile, zipfile
+import pytest, json, os, tempfile, zipfile
 from pathlib import Path
 from datetime import datetime
 
@@ -145,6 +145,30 @@ class TestClaudeCodeParser:
         assert all(t["message_id"] in msg_ids for t in result.tools)
         assert all(e["message_id"] in msg_ids for e in result.edits)
 
+    def test_unicode_line_separators_stay_inside_events(self, tmp_path):
+        """Raw U+2028 inside a JSON string does not split the JSONL line."""
+        from ai_convos.cli import parse_claude_code
+
+        session_dir = tmp_path / ".claude" / "projects" / "-test"
+        session_dir.mkdir(parents=True)
+        (session_dir / "s.jsonl").write_text(json.dumps({"type": "human", "timestamp": "2024-01-01T00:00:00Z", "message": {"content": "a\u2028b"}}, ensure_ascii=False) + "\n", encoding="utf-8")
+
+        assert [m["content"] for m in parse_claude_code(tmp_path / ".claude" / "projects").msgs] == ["a\u2028b"]
+
+    def test_many_sessions_parse_in_worker_processes(self, tmp_path, monkeypatch):
+        """Large batches go through the process pool and keep file order and parse results."""
+        from ai_convos import cli
+
+        session_dir = tmp_path / "projects" / "-test"
+        session_dir.mkdir(parents=True)
+        files = [session_dir / f"s{i:02}.jsonl" for i in range(65)]
+        for i, f in enumerate(files): f.write_text(json.dumps({"type": "human", "timestamp": "2024-01-01T00:00:00Z", "message": {"content": f"msg {i}"}}))
+        files[-1].write_text(json.dumps({"type": "system"}))
+        monkeypatch.setattr(cli.os, "cpu_count", lambda: 2)
+
+        result = cli.parse_claude_code(tmp_path / "projects", files)
+        assert [m["content"] for m in result.msgs] == [f"msg {i}" for i in range(64)]
+
     def test_empty_session_skipped(self, tmp_path):
         """Empty sessions (no messages) are skipped."""
         from ai_convos.cli import parse_claude_code
@@ -569,27 +593,14 @@ class TestClaudeExportParser:
 class TestIDGeneration:
     """Tests for consistent ID generation."""
 
-    def test_id_length(self):
-        """Generated IDs are 16 characters."""
+    @pytest.mark.parametrize("source,key", [("test", "123"), ("claude-code", "/Users/test/.claude/projects/-test/session-abc.jsonl")])
+    def test_id_shape_and_stability(self, source, key):
+        """IDs are 16 hex chars and the same key yields the same ID on every sync."""
         from ai_convos.cli import gen_id
-        assert len(gen_id("test", "123")) == 16
-
-    def test_id_hex(self):
-        """Generated IDs are valid hex."""
-        from ai_convos.cli import gen_id
-        id_ = gen_id("test", "123")
+        id_ = gen_id(source, key)
+        assert len(id_) == 16 and id_ == gen_id(source, key)
         int(id_, 16)  # should not raise
 
-    def test_id_consistent_across_syncs(self):
-        """Same file path produces same conversation ID."""
-        from ai_convos.cli import gen_id
-
-        # Simulating multiple syncs of same session
-        path = "/Users/test/.claude/projects/-test/session-abc.jsonl"
-        id1 = gen_id("claude-code", path)
-        id2 = gen_id("claude-code", path)
-        assert id1 == id2
-
 
 def test_parse_failures_are_visible(capsys):
     from ai_convos.cli import safe_parse
@@ -597,10 +608,42 @@ def test_parse_failures_are_visible(capsys):
     assert "parse error (broken fixture): ZeroDivisionError" in capsys.readouterr().err
 
 
-def test_latest_mtime_includes_export_formats(tmp_path):
+def test_detect_source_sniffs_first_conversation_keys(tmp_path):
+    from ai_convos.cli import detect_source
+    cases = {"a.json": [{"title": "t", "mapping": {"n": {"message": {"content": {"parts": ["chat_messages"]}}}}}],
+             "b.json": [{"uuid": "u", "chat_messages": [{"text": "the mapping key"}]}], "c.json": [{"uuid": "u"}],
+             "e.json": [{"title": "chat_messages", "mapping" : {}}], "f.json": [{"uuid": "u", "name": "mapping", "chat_messages": []}]}
+    for name, data in cases.items(): (tmp_path / name).write_text(json.dumps(data))
+    (tmp_path / "d.json").write_text("[]")
+    assert [detect_source(tmp_path / n) for n in cases] == ["chatgpt", "claude", "chatgpt", "chatgpt", "claude"]
+    with pytest.raises(ValueError, match="Empty export"): detect_source(tmp_path / "d.json")
+
+def test_iter_json_array_streams_elements():
+    from ai_convos.cli import iter_json_array
+    assert list(iter_json_array(' [ {"id": "]"} ,\n [1, 2], "x"]\n')) == [{"id": "]"}, [1, 2], "x"] and list(iter_json_array("[]")) == []
+    assert list(iter_json_array('{"a": 1}')) == ["a"]  # non-array exports iterate like json.loads did
+    for bad in ('[{"id": 1},', '[{"id": 1}', '[1 2]', '[,,1]', '[1,,2]', '[1,]', '[1,\u00a02]', '[1] x', '[1]]'):
+        with pytest.raises(json.JSONDecodeError): list(iter_json_array(bad))  # whatever json.loads rejects
+
+def test_latest_mtime_includes_export_formats(tmp_path, monkeypatch):
     from ai_convos.cli import latest_mtime
     (tmp_path / "export.json").write_text("[]")
     assert latest_mtime(tmp_path) == (tmp_path / "export.json").stat().st_mtime
+    (tmp_path / "old").mkdir(); (tmp_path / "old" / "a.zip").write_text(""); os.utime(tmp_path / "old" / "a.zip", (9e9, 9e9)); (tmp_path / "b.txt").write_text("")
+    assert latest_mtime(tmp_path) == 9e9 and latest_mtime(tmp_path, (".json",)) == (tmp_path / "export.json").stat().st_mtime
+    scandir = os.scandir; monkeypatch.setattr(os, "scandir", lambda p: (_ for _ in ()).throw(PermissionError(p)) if str(p).endswith("old") else scandir(p))
+    assert latest_mtime(tmp_path) == (tmp_path / "export.json").stat().st_mtime  # an unreadable directory is skipped, not fatal
+
+def test_file_mtimes_walks_nested_sessions(tmp_path):
+    from ai_convos.cli import file_mtimes
+    for rel in ("a.jsonl", "2026/01/b.jsonl", "2026/notes.txt"): (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True); (tmp_path / rel).write_text("{}")
+    assert file_mtimes(tmp_path) == {str(p): p.stat().st_mtime for p in tmp_path.rglob("*.jsonl")} and len(file_mtimes(tmp_path)) == 2
+
+def test_file_mtimes_skips_unreadable_directories(tmp_path, monkeypatch):
+    from ai_convos.cli import file_mtimes
+    for rel in ("a.jsonl", "locked/b.jsonl"): (tmp_path / rel).parent.mkdir(exist_ok=True); (tmp_path / rel).write_text("{}")
+    scandir = os.scandir; monkeypatch.setattr(os, "scandir", lambda p: (_ for _ in ()).throw(PermissionError(p)) if str(p).endswith("locked") else scandir(p))  # chmod cannot lock out root
+    assert list(file_mtimes(tmp_path)) == [str(tmp_path / "a.jsonl")]
 
 
 # ---- Timestamp Parsing Tests ----
@@ -608,30 +651,15 @@ def test_latest_mtime_includes_export_formats(tmp_path):
 class TestTimestampParsing:
     """Tests for timestamp parsing utilities."""
 
-    def test_epoch_to_datetime(self):
-        """Parse Unix epoch timestamp."""
-        from ai_convos.cli import ts_from_epoch
-        dt = ts_from_epoch(1704067200)  # 2024-01-01 00:00:00 UTC
-        assert dt.year == 2024
-        assert dt.month == 1
-        assert dt.day == 1
-
-    def test_epoch_none(self):
-        """None epoch returns None."""
-        from ai_convos.cli import ts_from_epoch
-        assert ts_from_epoch(None) is None
-
-    def test_iso_to_datetime(self):
-        """Parse ISO format timestamp."""
-        from ai_convos.cli import ts_from_iso
-        dt = ts_from_iso("2024-01-01T12:00:00Z")
-        assert dt.year == 2024
-        assert dt.hour == 12
-
-    def test_iso_none(self):
-        """None ISO returns None."""
-        from ai_convos.cli import ts_from_iso
-        assert ts_from_iso(None) is None
+    @pytest.mark.parametrize("fn,arg,expected", [
+        ("ts_from_epoch", 1704067200, dict(year=2024, month=1, day=1)),  # 2024-01-01 00:00:00 UTC
+        ("ts_from_iso", "2024-01-01T12:00:00Z", dict(year=2024, hour=12)),
+        ("ts_from_epoch", None, None), ("ts_from_iso", None, None)])
+    def test_parse(self, fn, arg, expected):
+        """Parse epoch and ISO timestamps; None passes through."""
+        from ai_convos import cli
+        dt = getattr(cli, fn)(arg)
+        assert dt is None if expected is None else {k: getattr(dt, k) for k in expected} == expected
 
 
 class TestInstallSkills:
@@ -647,3 +675,16 @@ class TestInstallSkills:
         dests = [tmp_path / ".codex" / "skills" / "agent-convos" / "SKILL.md",
                  tmp_path / "custom-claude" / "skills" / "agent-convos" / "SKILL.md"]
         assert all(d.read_text() == src.read_text() for d in dests)
+
+def test_only_parse_workers_skip_plugin_loading(tmp_path):
+    import subprocess, sys
+    dist = tmp_path / "probe_plugin-0.dist-info"; dist.mkdir()
+    (dist / "METADATA").write_text("Metadata-Version: 2.1\nName: probe-plugin\nVersion: 0\n")
+    (dist / "entry_points.txt").write_text("[convos.commands]\nprobe = probe_plugin:register\n")
+    (tmp_path / "probe_plugin.py").write_text(f"import os\ndef register(app): open({str(tmp_path / 'loads')!r}, 'a').write(f'{{os.getpid()}}\\n')\n")
+    for i in range(64): (tmp_path / f"s{i}.jsonl").write_text(json.dumps({"type": "user", "timestamp": "2024-01-01T00:00:00Z", "message": {"content": "hi"}}))
+    code = (f"import os, multiprocessing\nfrom concurrent.futures import ProcessPoolExecutor\nfrom pathlib import Path\nfrom ai_convos import cli\nos.cpu_count = lambda: 2  # force the process pool\n"
+            f"print(len(cli.parse_claude_code(Path({str(tmp_path)!r})).convs), 'CONVOS_PARSE_WORKER' in os.environ)\n"
+            "with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as ex: print(len(ex.submit(cli.gen_id, 'a', 'b').result()))")  # any other child still loads plugins
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env={**os.environ, "PYTHONPATH": os.pathsep.join([str(tmp_path), os.environ.get("PYTHONPATH", "")])}, check=True).stdout
+    assert out.split() == ["64", "False", "16"] and len((tmp_path / "loads").read_text().split()) == 2  # the parent and the unrelated child, no parse worker